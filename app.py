@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Entry point for the fps.ms platform - starts the Discord bot"""
+
+import sys
+import os
+
+# Add the pokerparser directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__":
+    # Imported here and not at module level: parse worker processes re-import
+    # this file and must not load discord or config.json
+    from pokerparser.__main__ import main
+
+    main()
@@ -1,18 +1,131 @@
-"""Main entry point for the poker parser - runs the Discord bot"""
+"""Main entry point for the poker parser - runs the Discord bot or a maintenance subcommand"""
 
+import argparse
+import os
+import sqlite3
 import sys
-from .discordbot import bot, TOKEN
+from datetime import datetime
 
 
-def main():
-    """Main function to start the Discord bot"""
+def run_bot():
+    """Start the Discord bot"""
     try:
         print("Starting Discord bot...", file=sys.stderr)
-        bot.run(TOKEN)
+        # Imported lazily so the offline subcommands need neither discord nor config.json
+        from .discordbot import main as run_discord_bot
+        run_discord_bot()
     except Exception as e:
         print(f"Error starting bot: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def run_export(args):
+    """Stream the history archive to CSV or JSON Lines"""
+    from .archive import TournamentArchive
+
+    try:
+        archive = TournamentArchive(args.db, read_only=True)
+        archive.count()  # Fails here if the file is not an archive database
+    except sqlite3.Error as e:
+        print(f"Error opening archive {args.db}: {e}", file=sys.stderr)
+        sys.exit(1)
+    filters = {
+        "room": args.room,
+        "source": args.source,
+        "since": datetime.fromisoformat(args.since) if args.since else None,
+        "until": datetime.fromisoformat(args.until) if args.until else None,
+    }
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            written = archive.export_csv(out, **filters)
+        else:
+            written = archive.export_jsonl(out, **filters)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        archive.close()
+    print(f"Exported {written} rows", file=sys.stderr)
+
+
+def run_reparse(args):
+    """Re-parse saved HTML pages offline and stream events as JSON Lines"""
+    from .reparse import reparse
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        reparse(args.path, out, workers=args.workers, source=args.source, tz_offset=args.tz_offset)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def run_profile(args):
+    """Profile the parsers against saved HTML pages, one profiled cycle per page"""
+    from .profiler import PROFILER
+    from .reparse import iter_pages, parse_page
+
+    PROFILER.output_dir = args.dir
+    PROFILER.keep = args.keep
+    PROFILER.enable()
+    for _ in range(args.repeat):
+        for job in iter_pages(args.path):
+            with PROFILER.cycle(os.path.basename(job[0])):
+                parse_page(job, args.source, args.tz_offset)
+    print("\n".join(PROFILER.summary_lines()), file=sys.stderr)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m pokerparser")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("bot", help="Run the Discord bot (default)")
+
+    export = sub.add_parser("export", help="Export the history archive")
+    export.add_argument("--db", default="history.db", help="Archive database path")
+    export.add_argument("--format", choices=["csv", "jsonl"], default="jsonl")
+    export.add_argument("--output", "-o", help="Output file (default: stdout)")
+    export.add_argument("--room", help="Only events of this poker room")
+    export.add_argument("--source", help="Only events from this source site")
+    export.add_argument("--since", help="Only events starting at/after this ISO datetime")
+    export.add_argument("--until", help="Only events starting before this ISO datetime")
+
+    reparse = sub.add_parser("reparse", help="Re-parse saved HTML pages offline")
+    reparse.add_argument("path", help="Directory, tarball or single HTML file")
+    reparse.add_argument("--workers", "-j", type=int, help="Worker processes (default: CPU count)")
+    reparse.add_argument("--source", choices=["freerollpass.com", "freeroll-password.com"],
+                         help="Force the parser instead of detecting it per page")
+    reparse.add_argument("--output", "-o", help="Output file (default: stdout)")
+    reparse.add_argument("--tz-offset", type=int,
+                         help="freerollpass.com server timezone in hours from GMT "
+                              "(default: detected against each file's modification time)")
+
+    profile = sub.add_parser("profile", help="Profile the parsers on saved HTML pages")
+    profile.add_argument("path", help="Directory, tarball or single HTML file")
+    profile.add_argument("--source", choices=["freerollpass.com", "freeroll-password.com"],
+                         help="Force the parser instead of detecting it per page")
+    profile.add_argument("--dir", default="profiles", help="Output directory for profiles")
+    profile.add_argument("--keep", type=int, default=5, help="Keep stacks of the N slowest pages")
+    profile.add_argument("--repeat", type=int, default=1, help="Parse every page this many times")
+    profile.add_argument("--tz-offset", type=int,
+                         help="freerollpass.com server timezone in hours from GMT")
+
+    return parser
+
+
+def main(argv=None):
+    """Main function to dispatch subcommands"""
+    args = build_arg_parser().parse_args(argv)
+
+    if args.command == "export":
+        run_export(args)
+    elif args.command == "reparse":
+        run_reparse(args)
+    elif args.command == "profile":
+        run_profile(args)
+    else:
+        run_bot()
+
+
 if __name__ == "__main__":
     main()
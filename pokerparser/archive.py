@@ -0,0 +1,198 @@
+"""SQLite archive of every scraped tournament snapshot version"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from .models import TournamentEvent, event_to_dict
+
+
+# Columns exported by query()/export_*(), in output order
+ARCHIVE_COLUMNS = [
+    "start", "date", "time", "is_all_day", "room", "name", "prize",
+    "password", "source", "first_seen", "last_seen", "times_seen",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id          INTEGER PRIMARY KEY,
+    start       TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    time        TEXT,
+    is_all_day  INTEGER NOT NULL,
+    room        TEXT NOT NULL COLLATE NOCASE,
+    name        TEXT NOT NULL,
+    prize       TEXT NOT NULL,
+    password    TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    times_seen  INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (start, source, room, name, prize, password)
+);
+-- Covers the start-range scans of query() and top_rooms() without table lookups
+DROP INDEX IF EXISTS idx_events_start;
+CREATE INDEX IF NOT EXISTS idx_events_start_room ON events (start, room, name);
+CREATE INDEX IF NOT EXISTS idx_events_room ON events (room, start);
+CREATE INDEX IF NOT EXISTS idx_events_source ON events (source, start);
+"""
+
+# One row per distinct version of an event: re-seeing the same version only
+# bumps last_seen, while a changed field (e.g. a published password) creates
+# a new row whose first_seen records when the change appeared.
+UPSERT = """
+INSERT INTO events (start, date, time, is_all_day, room, name, prize,
+                    password, source, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (start, source, room, name, prize, password) DO UPDATE SET
+    last_seen = excluded.last_seen,
+    times_seen = times_seen + 1
+"""
+
+
+class TournamentArchive:
+    """Append-only history of scraped events stored in an embedded SQLite database
+
+    Writes go through the connection of the creating thread. The read methods
+    may also be called from worker threads (e.g. run_in_executor from the bot);
+    each such thread gets its own connection.
+    """
+
+    def __init__(self, path: str = "history.db", read_only: bool = False):
+        self.path = path
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        if read_only:
+            # mode=ro fails on a missing file instead of creating an empty archive
+            self._target, self._uri = f"file:{quote(os.path.abspath(path))}?mode=ro", True
+        else:
+            self._target, self._uri = path, False
+        self.conn = sqlite3.connect(self._target, uri=self._uri)
+        self.conn.row_factory = sqlite3.Row
+        if read_only:
+            return
+        # WAL keeps readers (exports, !history) from blocking the per-cycle write
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection and the worker threads' readers"""
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for reader in readers:
+            reader.close()
+        self.conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Connection for reads in the calling thread"""
+        if threading.get_ident() == self._owner:
+            return self.conn
+        reader = getattr(self._local, "conn", None)
+        if reader is None:
+            # check_same_thread=False only so close() may close it from the owner thread
+            reader = sqlite3.connect(self._target, uri=self._uri, check_same_thread=False)
+            reader.row_factory = sqlite3.Row
+            self._local.conn = reader
+            with self._readers_lock:
+                self._readers.append(reader)
+        return reader
+
+    @staticmethod
+    def _row_for(event: TournamentEvent, seen: str) -> Tuple:
+        data = event_to_dict(event)
+        start = data["date"] + "T" + (data["time"] or "00:00:00")
+        return (
+            start, data["date"], data["time"], int(data["is_all_day"]),
+            data["room"], data["name"], data["prize"], data["password"] or "",
+            data["source"], seen, seen,
+        )
+
+    def record_snapshot(self, events: Iterable[TournamentEvent],
+                        scraped_at: Optional[datetime] = None) -> int:
+        """Store one scrape cycle in a single transaction, return number of rows written"""
+        seen = (scraped_at or datetime.now()).isoformat(timespec="seconds")
+        rows = [self._row_for(e, seen) for e in events]
+        if not rows:
+            return 0
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    @staticmethod
+    def _where(room: Optional[str], source: Optional[str],
+               since: Optional[datetime], until: Optional[datetime]) -> Tuple[str, List]:
+        clauses = []
+        params: List = []
+        if room:
+            clauses.append("room = ?")
+            params.append(room)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if since:
+            clauses.append("start >= ?")
+            params.append(since.isoformat(timespec="seconds"))
+        if until:
+            clauses.append("start < ?")
+            params.append(until.isoformat(timespec="seconds"))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query(self, room: Optional[str] = None, source: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              limit: Optional[int] = None, newest_first: bool = False) -> Iterator[Dict]:
+        """Stream archived event versions matching the filters, ordered by start time"""
+        where, params = self._where(room, source, since, until)
+        sql = f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM events{where} ORDER BY start"
+        if newest_first:
+            sql += " DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        # Iterating the cursor fetches rows lazily, so exports never hold
+        # the whole table in memory.
+        for row in self._reader().execute(sql, params):
+            data = dict(row)
+            data["is_all_day"] = bool(data["is_all_day"])
+            yield data
+
+    def count(self) -> int:
+        """Total number of archived event versions"""
+        return self._reader().execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def top_rooms(self, since: Optional[datetime] = None, limit: int = 10) -> List[Tuple[str, int]]:
+        """Rooms with the most distinct events since the given time"""
+        where, params = self._where(None, None, since, None)
+        # Without the hint SQLite prefers idx_events_room for the GROUP BY and
+        # scans the whole table; the covering start index reads only the window
+        hint = " INDEXED BY idx_events_start_room" if since else ""
+        sql = (
+            f"SELECT room, COUNT(DISTINCT start || name) AS n FROM events{hint}"
+            f"{where} GROUP BY room ORDER BY n DESC LIMIT ?"
+        )
+        return [(row["room"], row["n"]) for row in self._reader().execute(sql, params + [limit])]
+
+    def export_csv(self, fp: IO[str], **filters) -> int:
+        """Write matching rows as CSV, return number of rows written"""
+        writer = csv.DictWriter(fp, fieldnames=ARCHIVE_COLUMNS)
+        writer.writeheader()
+        written = 0
+        for row in self.query(**filters):
+            writer.writerow(row)
+            written += 1
+        return written
+
+    def export_jsonl(self, fp: IO[str], **filters) -> int:
+        """Write matching rows as JSON Lines, return number of rows written"""
+        written = 0
+        for row in self.query(**filters):
+            fp.write(json.dumps(row, ensure_ascii=False) + "\n")
+            written += 1
+        return written
@@ -0,0 +1,121 @@
+"""Chat command dispatch with per-user / per-channel throttling and a rendered-response cache"""
+
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+# Messages that don't start with this are ignored before any other work
+COMMAND_PREFIX = "!"
+
+
+class TokenBucket:
+    """Classic token bucket: capacity burst, refilled at rate tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, now: Optional[float] = None) -> bool:
+        """Take one token if available"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def is_full(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class ResponseCache:
+    """Small LRU of rendered command responses
+
+    Keys include the snapshot version, so a new scrape naturally makes old
+    entries unreachable; they then age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, List[str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], List[str]]) -> List[str]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        value = render()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+
+class CommandRouter:
+    """Maps the first word of a message to its handler
+
+    Each accepted command costs one token from the author's bucket and one
+    from the channel's bucket; commands over either limit are dropped.
+    """
+
+    def __init__(self, user_rate: float = 0.2, user_burst: int = 3,
+                 channel_rate: float = 1.0, channel_burst: int = 10):
+        self.handlers: Dict[str, Callable[..., Awaitable]] = {}
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.user_buckets: Dict[int, TokenBucket] = {}
+        self.channel_buckets: Dict[int, TokenBucket] = {}
+        self.throttled = 0  # Metric: commands dropped by the rate limits
+        self._last_prune = time.monotonic()
+
+    def register(self, name: str, handler: Callable[..., Awaitable]) -> None:
+        self.handlers[name.lower()] = handler
+
+    def _bucket(self, buckets: Dict[int, TokenBucket], key: int, rate: float, burst: int) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        """Forget refilled buckets so idle users don't accumulate"""
+        if now - self._last_prune < 300:
+            return
+        self._last_prune = now
+        for buckets in (self.user_buckets, self.channel_buckets):
+            for key in [k for k, b in buckets.items() if b.is_full(now)]:
+                del buckets[key]
+
+    def allow(self, user_id: int, channel_id: int) -> bool:
+        now = time.monotonic()
+        self._prune(now)
+        user = self._bucket(self.user_buckets, user_id, self.user_rate, self.user_burst)
+        channel = self._bucket(self.channel_buckets, channel_id, self.channel_rate, self.channel_burst)
+        # Check the user first so one spammer doesn't drain the channel's bucket
+        if not user.consume(now) or not channel.consume(now):
+            self.throttled += 1
+            return False
+        return True
+
+    async def dispatch(self, message) -> bool:
+        """Run the handler for message if it is a known, non-throttled command"""
+        content = message.content
+        if not content.startswith(COMMAND_PREFIX):
+            return False
+        name = content.split(maxsplit=1)[0].lower()
+        handler = self.handlers.get(name)
+        if handler is None:
+            return False
+        if not self.allow(message.author.id, message.channel.id):
+            print(f"Throttled {name} from user {message.author.id} in channel {message.channel.id}")
+            return False
+        await handler(message)
+        return True
@@ -0,0 +1,247 @@
+"""Configuration loading, validation and hot reload of config.json"""
+
+import asyncio
+import inspect
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Parser is picked by source name, so only these names are accepted in "sources"
+KNOWN_SOURCES = ("freeroll-password.com", "freerollpass.com")
+
+DEFAULTS: Dict[str, Any] = {
+    "sources": {
+        "freeroll-password.com": "https://freeroll-password.com/",
+        "freerollpass.com": "https://freerollpass.com/",
+    },
+    "poll_interval": 300,       # Seconds between scrapes
+    "alert_offsets": [60, 10],  # Minutes before start to send alerts
+    "archive_path": "history.db",
+    "summary_mode": "post",
+    "live_board_refresh": 300,
+    "feed_server": None,
+    "admin_channel_id": None,   # Parser drift alerts, defaults to channel_id
+    "runtime": None,            # Staged/sharded runtime, see RUNTIME_DEFAULTS
+    "password_poll_interval": 60,   # Seconds between pending-password checks, 0 disables
+    "password_watch_window": 90,    # Minutes before start in which pending passwords are watched
+}
+
+RUNTIME_DEFAULTS: Dict[str, Any] = {
+    "sharded": False,           # Use discord.AutoShardedClient
+    "shard_count": None,        # None lets Discord recommend a count
+    "parse_workers": 2,         # Parser processes
+    "queue_size": 4,            # Capacity of each queue between pipeline stages
+    "send_queue_size": 50,      # Capacity of the outgoing message queue
+    "memory_limit_mb": None,    # tracemalloc ceiling, None disables the guard
+}
+
+
+def find_config_path() -> Optional[str]:
+    """Return the first existing config.json location, or None"""
+    for config_path in possible_config_paths():
+        if os.path.exists(config_path):
+            return config_path
+    return None
+
+
+def possible_config_paths() -> List[str]:
+    return [
+        "config.json",  # Current directory
+        os.path.join(os.path.dirname(__file__), "..", "config.json"),  # Parent directory
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json"),  # Absolute parent
+    ]
+
+
+def read_config(config_path: str) -> Dict[str, Any]:
+    """Read config.json and fill in defaults for optional keys"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("config.json must contain a JSON object")
+    merged = dict(DEFAULTS)
+    merged.update(data)
+    if isinstance(merged.get("runtime"), dict):
+        merged["runtime"] = dict(RUNTIME_DEFAULTS, **merged["runtime"])
+    return merged
+
+
+def validate_config(data: Dict[str, Any]) -> List[str]:
+    """Return a list of human-readable problems, empty if the config is usable"""
+    errors = []
+
+    if not data.get("discord_token") or not isinstance(data.get("discord_token"), str):
+        errors.append("discord_token not found in config.json")
+    if not isinstance(data.get("channel_id"), int) or isinstance(data.get("channel_id"), bool):
+        errors.append("channel_id not found in config.json (must be a number)")
+
+    admin_channel = data.get("admin_channel_id")
+    if admin_channel is not None and (not isinstance(admin_channel, int) or isinstance(admin_channel, bool)):
+        errors.append("admin_channel_id must be a channel ID number")
+
+    sources = data.get("sources")
+    if not isinstance(sources, dict) or not sources:
+        errors.append("sources must be a non-empty object of source name -> URL")
+    else:
+        for name, url in sources.items():
+            if name not in KNOWN_SOURCES:
+                errors.append(f"unknown source '{name}' (known: {', '.join(KNOWN_SOURCES)})")
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                errors.append(f"source '{name}' needs an http(s) URL")
+
+    interval = data.get("poll_interval")
+    if not isinstance(interval, (int, float)) or interval < 30:
+        errors.append("poll_interval must be a number of seconds >= 30")
+
+    offsets = data.get("alert_offsets")
+    if (not isinstance(offsets, list) or not offsets
+            or not all(isinstance(o, int) and o > 0 for o in offsets)):
+        errors.append("alert_offsets must be a non-empty list of positive minutes")
+
+    password_interval = data.get("password_poll_interval")
+    if (not isinstance(password_interval, (int, float))
+            or (password_interval != 0 and password_interval < 15)):
+        errors.append("password_poll_interval must be 0 (off) or a number of seconds >= 15")
+
+    password_window = data.get("password_watch_window")
+    if not isinstance(password_window, int) or password_window < 1:
+        errors.append("password_watch_window must be a positive number of minutes")
+
+    if data.get("summary_mode") not in ("post", "live"):
+        errors.append("summary_mode must be \"post\" or \"live\"")
+
+    refresh = data.get("live_board_refresh")
+    if not isinstance(refresh, (int, float)) or refresh < 0:
+        errors.append("live_board_refresh must be a number of seconds >= 0")
+
+    if not isinstance(data.get("archive_path"), str):
+        errors.append("archive_path must be a file path")
+
+    feed = data.get("feed_server")
+    if feed is not None:
+        if not isinstance(feed, dict):
+            errors.append("feed_server must be an object like {\"host\": ..., \"port\": ...}")
+        else:
+            port = feed.get("port", 8080)
+            if not isinstance(port, int) or not 0 < port < 65536:
+                errors.append("feed_server.port must be a TCP port number")
+
+    runtime = data.get("runtime")
+    if runtime is not None:
+        if not isinstance(runtime, dict):
+            errors.append("runtime must be an object")
+        else:
+            for key in ("parse_workers", "queue_size", "send_queue_size"):
+                value = runtime.get(key)
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    errors.append(f"runtime.{key} must be a positive integer")
+            shard_count = runtime.get("shard_count")
+            if shard_count is not None and (not isinstance(shard_count, int) or shard_count < 1):
+                errors.append("runtime.shard_count must be a positive integer or null")
+            limit = runtime.get("memory_limit_mb")
+            if limit is not None and (not isinstance(limit, (int, float)) or limit <= 0):
+                errors.append("runtime.memory_limit_mb must be a positive number or null")
+
+    return errors
+
+
+def load_config() -> Tuple[str, Dict[str, Any]]:
+    """Load and validate configuration from config.json, exit if unusable"""
+    config_path = find_config_path()
+
+    if config_path is None:
+        # If no config file found, show error and exit
+        print("ERROR: config.json not found!")
+        print("Please create a config.json file based on config.example.json")
+        print("Expected locations:")
+        for path in possible_config_paths():
+            print(f"  - {os.path.abspath(path)}")
+        sys.exit(1)
+
+    try:
+        data = read_config(config_path)
+    except Exception as e:
+        print(f"ERROR: Failed to load config from {config_path}: {e}")
+        sys.exit(1)
+
+    errors = validate_config(data)
+    if errors:
+        for error in errors:
+            print(f"ERROR: {error}")
+        sys.exit(1)
+
+    return config_path, data
+
+
+class ConfigWatcher:
+    """Polls config.json and hands validated changes to subscribers
+
+    A change is applied all-or-nothing: the file is parsed and validated as a
+    whole, and an invalid edit is reported and ignored, leaving the running
+    configuration untouched. Subscribers only run when one of their keys changed.
+    """
+
+    def __init__(self, path: str, config: Dict[str, Any], poll_seconds: float = 5):
+        self.path = path
+        self.config = config
+        self.poll_seconds = poll_seconds
+        self._subscribers: List[Tuple[Tuple[str, ...], Callable]] = []
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def subscribe(self, keys: Iterable[str], callback: Callable) -> None:
+        """Call callback(new_config, old_config, changed_keys) when any of keys changes
+
+        The callback may be a plain function or a coroutine function.
+        """
+        self._subscribers.append((tuple(keys), callback))
+
+    async def check(self) -> bool:
+        """Reload the file if it changed on disk, return True if a new config was applied"""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            new_config = read_config(self.path)
+        except Exception as e:
+            print(f"Config reload skipped, cannot read {self.path}: {e}")
+            return False
+
+        errors = validate_config(new_config)
+        if errors:
+            print(f"Config reload rejected ({len(errors)} problems), keeping the running config:")
+            for error in errors:
+                print(f"  - {error}")
+            return False
+
+        changed = {k for k in set(new_config) | set(self.config) if new_config.get(k) != self.config.get(k)}
+        if not changed:
+            return False
+
+        old_config = self.config
+        self.config = new_config
+        print(f"Config reloaded, changed: {', '.join(sorted(changed))}")
+
+        for keys, callback in self._subscribers:
+            if not changed.intersection(keys):
+                continue
+            try:
+                result = callback(new_config, old_config, changed)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error applying config change in {getattr(callback, '__name__', callback)}: {e}")
+        return True
+
+    async def run(self) -> None:
+        """Poll for changes forever"""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            await self.check()
@@ -1,68 +1,63 @@
 import discord
 import asyncio
+import contextvars
 import requests
 import re
 import json
 import os
-import sys
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 from itertools import cycle
-from typing import List, cast, Union
-from .freerollpass import FreerollParser
-from .freeroll_password import FreeRollPasswordParser
-from .models import TournamentEvent
+from typing import List, Optional, Tuple, cast, Union
+from .models import TournamentEvent, event_to_dict, get_event_datetime, identity_key, is_password_pending
+from .archive import TournamentArchive
+from .snapshot import EventSnapshot
+from .feedserver import FeedServer
+from .liveboard import LiveBoard
+from .config import ConfigWatcher, load_config
+from .drift import DriftMonitor
+from .runtime import PARSERS, Pipeline, Sender
+from .commands import CommandRouter, ResponseCache
+from .profiler import PROFILER, span
 
 # ------------------------------------------------------
 # CONFIG LOADING
 # ------------------------------------------------------
-def load_config():
-    """Load configuration from config.json file"""
-    # Try to find config.json in multiple locations
-    possible_paths = [
-        "config.json",  # Current directory
-        os.path.join(os.path.dirname(__file__), "..", "config.json"),  # Parent directory
-        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json"),  # Absolute parent
-    ]
-    
-    for config_path in possible_paths:
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config from {config_path}: {e}")
-                continue
-    
-    # If no config file found, show error and exit
-    print("ERROR: config.json not found!")
-    print("Please create a config.json file based on config.example.json")
-    print("Expected locations:")
-    for path in possible_paths:
-        print(f"  - {os.path.abspath(path)}")
-    sys.exit(1)
-
-# Load configuration
-config = load_config()
-TOKEN = config.get("discord_token")
-CHANNEL_ID = config.get("channel_id")
-
-if not TOKEN:
-    print("ERROR: discord_token not found in config.json")
-    sys.exit(1)
-
-if not CHANNEL_ID:
-    print("ERROR: channel_id not found in config.json")
-    sys.exit(1)
+# Load configuration (exits with an error message if missing or invalid)
+CONFIG_PATH, config = load_config()
+TOKEN = config["discord_token"]
+CHANNEL_ID = config["channel_id"]
+# Channel for parser drift alerts (falls back to CHANNEL_ID)
+ADMIN_CHANNEL_ID = config["admin_channel_id"]
 
 LAST_EVENT_FILE = "last_event.json"
+PARSER_BASELINE_FILE = "parser_baseline.json"
+ARCHIVE_FILE = config["archive_path"]
+# "post": header + one message per new event, "live": one edited board per day
+SUMMARY_MODE = config["summary_mode"]
+LIVE_BOARD_FILE = "live_board.json"
+# Minimum seconds between countdown-only board refreshes
+LIVE_BOARD_REFRESH = config["live_board_refresh"]
+# Optional HTTP/iCal feed, e.g. {"host": "127.0.0.1", "port": 8080}
+FEED_SERVER_CONFIG = config["feed_server"]
+# Source name -> URL, the parser is chosen by name (see PARSERS)
+SOURCES = dict(config["sources"])
+# Seconds between scrapes
+POLL_INTERVAL = config["poll_interval"]
+# Minutes before start at which alerts are sent, largest first
+ALERT_OFFSETS = sorted(config["alert_offsets"], reverse=True)
+# Staged runtime for large deployments (None: everything in the watcher loop)
+RUNTIME_CONFIG = config["runtime"]
+# Focused re-check of events whose password is not published yet
+PASSWORD_POLL_INTERVAL = config["password_poll_interval"]
+PASSWORD_WATCH_WINDOW = config["password_watch_window"]
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = discord.Client(intents=intents)
-
-URL_PASSWORD = "https://freeroll-password.com/"
-URL_PASS = "https://freerollpass.com/"
+if RUNTIME_CONFIG and RUNTIME_CONFIG["sharded"]:
+    bot = discord.AutoShardedClient(intents=intents, shard_count=RUNTIME_CONFIG["shard_count"])
+else:
+    bot = discord.Client(intents=intents)
 
 # ------------------------------------------------------
 # DISCORD WRAPPER FOR DRY RUN
@@ -73,71 +68,87 @@ async def send_discord_message(target, content: str):
     
     if dry_run:  # Non-empty string means DRY_RUN mode
         print(f"[DRY_RUN] Message to {target}: {content}")
+        return None
+    with span("discord.send"):
+        return await target.send(content)
+
+async def queue_discord_message(target, content: str, on_sent=None, on_failed=None):
+    """Send through the bounded send stage when the staged runtime is enabled
+
+    on_sent() is called once the message was actually sent, on_failed() if
+    sending it failed.
+    """
+    if SENDER:
+        await SENDER.put(target, content, on_sent, on_failed)
+        return
+    try:
+        await send_discord_message(target, content)
+    except Exception:
+        if on_failed is not None:
+            on_failed()
+        raise
+    if on_sent is not None:
+        on_sent()
+
+async def edit_discord_message(message, content: str):
+    """Edit a sent Discord message or print to console based on DRY_RUN env variable"""
+    dry_run = os.environ.get('DRY_RUN', '')
+
+    if dry_run:
+        print(f"[DRY_RUN] Edit of message {message.id}: {content}")
     else:
-        await target.send(content)
+        with span("discord.edit"):
+            await message.edit(content=content)
 
 # ------------------------------------------------------
-# SCRAPER – freeroll-password.com
+# SCRAPER – one configured source
 # ------------------------------------------------------
-def fetch_freerolls_password() -> List[TournamentEvent]:
-    """Fetch freerolls from freeroll-password.com"""
-    try:
-        parser = FreeRollPasswordParser(url=URL_PASSWORD)
-        tournaments = parser.get_tournaments()
-        return tournaments if tournaments else []
-    except:
-        return []
+# Per-source parse health; keeps the last good events while a site's markup drifts
+DRIFT_MONITOR = DriftMonitor(PARSER_BASELINE_FILE)
 
+def fetch_source(name: str, url: str) -> Tuple[List[TournamentEvent], bool]:
+    """Fetch freerolls from a single configured source
 
-# ------------------------------------------------------
-# SCRAPER – freerollpass.com
-# ------------------------------------------------------
-def fetch_freerolls_pass() -> List[TournamentEvent]:
-    """Fetch freerolls from freerollpass.com"""
+    Returns (events, fresh). Falls back to the source's last good events
+    (fresh=False) when it is backed off after parser drift or when the fetch fails.
+    """
+    now = datetime.now()
+    if not DRIFT_MONITOR.should_fetch(name, now):
+        return DRIFT_MONITOR.last_good(name), False
     try:
-        parser = FreerollParser(url=URL_PASS)
+        parser = PARSERS[name](url=url)
+        parser.baseline = DRIFT_MONITOR.baseline(name)
         tournaments = parser.get_tournaments()
-        return tournaments if tournaments else []
-    except:
-        return []
+    except Exception as e:
+        print(f"Error fetching {name}: {e}")
+        return DRIFT_MONITOR.last_good(name), False
+    events = DRIFT_MONITOR.record(name, tournaments or [], parser.stats, now)
+    return events, not DRIFT_MONITOR.health(name).drifting
 
 
 # ------------------------------------------------------
 # COMBINED SCRAPER
 # ------------------------------------------------------
-def get_event_datetime(event: TournamentEvent) -> datetime:
-    """Get datetime from event (date + time fields)"""
-    if event['is_all_day'] or event['time'] is None:
-        # For all-day events, use midnight
-        return datetime.combine(event['date'], datetime.min.time())
-    return datetime.combine(event['date'], event['time'])
-
-def fetch_freerolls() -> List[TournamentEvent]:
-    """Fetch freerolls from all sources and combine them"""
-    events: List[TournamentEvent] = []    # Fetch from both sources
-    events.extend(fetch_freerolls_password())
-    events.extend(fetch_freerolls_pass())
+def fetch_freerolls() -> Tuple[List[TournamentEvent], List[TournamentEvent]]:
+    """Fetch freerolls from all configured sources and combine them
+
+    Returns (all events, the freshly parsed ones among them).
+    """
+    events: List[TournamentEvent] = []
+    fresh: List[TournamentEvent] = []
+    for name, url in list(SOURCES.items()):
+        source_events, is_fresh = fetch_source(name, url)
+        events.extend(source_events)
+        if is_fresh:
+            fresh.extend(source_events)
     
     # Sort by date and time
     events.sort(key=lambda x: get_event_datetime(x))
-    return events
+    return events, fresh
 
 # ------------------------------------------------------
 # EVENT STORAGE HELPERS
 # ------------------------------------------------------
-def event_to_dict(event: TournamentEvent) -> dict:
-    """Convert TournamentEvent to dictionary for comparison/storage"""
-    return {
-        "date": event["date"].isoformat(),
-        "time": event["time"].isoformat() if event["time"] else None,
-        "is_all_day": event["is_all_day"],
-        "room": event["room"],
-        "name": event["name"],
-        "prize": event["prize"],
-        "password": event["password"],
-        "source": event.get("source", "n/a")
-    }
-
 def load_sent_events() -> List[dict]:
     """Load all sent events from file"""
     if not os.path.exists(LAST_EVENT_FILE):
@@ -160,8 +171,18 @@ def save_sent_events(events: List[dict]) -> None:
     except Exception as e:
         print(f"Error saving sent events: {e}")
 
+# Announcements queued but not delivered yet (event key -> event_to_dict data).
+# They count as sent, so a cycle running before the sender caught up doesn't
+# queue them again; a failed send removes them so the next cycle retries.
+IN_FLIGHT_EVENTS: dict = {}
+
+def event_key(event: TournamentEvent) -> str:
+    return json.dumps(event_to_dict(event), sort_keys=True)
+
 def event_already_sent(event: TournamentEvent, sent_events: List[dict]) -> bool:
-    """Check if event was already sent (deep compare all fields)"""
+    """Check if event was already sent or is being sent (deep compare all fields)"""
+    if event_key(event) in IN_FLIGHT_EVENTS:
+        return True
     event_data = event_to_dict(event)
     for sent_event in sent_events:
         if event_data == sent_event:
@@ -174,10 +195,39 @@ def add_sent_event(event: TournamentEvent) -> None:
     event_data = event_to_dict(event)
     
     # Only add if not already in list
-    if not event_already_sent(event, sent_events):
+    if event_data not in sent_events:
         sent_events.append(event_data)
         save_sent_events(sent_events)
 
+async def queue_event_message(target, content: str, event: TournamentEvent):
+    """Queue a message announcing event; it is recorded as sent once delivered"""
+    key = event_key(event)
+    IN_FLIGHT_EVENTS[key] = event_to_dict(event)
+
+    def sent():
+        IN_FLIGHT_EVENTS.pop(key, None)
+        add_sent_event(event)
+
+    def failed():
+        IN_FLIGHT_EVENTS.pop(key, None)
+
+    await queue_discord_message(target, content, on_sent=sent, on_failed=failed)
+
+def find_password_change(event: TournamentEvent, sent_events: List[dict]):
+    """Return the latest sent (or in-flight) version of event if only its password differs
+
+    Any other change, e.g. the prize, returns None so the event is announced in full.
+    """
+    event_data = event_to_dict(event)
+    rest = {k: v for k, v in event_data.items() if k != "password"}
+    for sent_event in reversed(sent_events + list(IN_FLIGHT_EVENTS.values())):
+        if sent_event.get("password") == event_data["password"]:
+            continue
+        if identity_key(sent_event) == identity_key(event_data) and \
+                {k: v for k, v in sent_event.items() if k != "password"} == rest:
+            return sent_event
+    return None
+
 def cleanup_old_events() -> None:
     """Remove events older than today from sent events list"""
     sent_events = load_sent_events()
@@ -219,70 +269,222 @@ def fmt(e: TournamentEvent) -> str:
         f"──────────────"
     )
 
+def fmt_password(e: TournamentEvent, previous: dict) -> str:
+    """Short message announcing a newly published (or changed) password"""
+    if is_password_pending(previous):
+        title = "🔑 **Password is live!**"
+    else:
+        title = f"🔑 **Password changed** (was: {previous.get('password')})"
+    if e['is_all_day'] or e['time'] is None:
+        when = f"{e['date'].strftime('%d.%m.%Y')} (all day)"
+    else:
+        when = get_event_datetime(e).strftime('%H:%M %d.%m.%Y')
+    return (
+        f"{title}\n"
+        f"💰 **{e['name']}** · 🏢 {e['room']} · 🕒 {when}\n"
+        f"🔑 Password: **{e['password']}**"
+    )
+
 # ------------------------------------------------------
 # COMMANDS
 # ------------------------------------------------------
-async def send_today(message):
-    # Use globally stored events from the watcher
-    global GLOBAL_EVENTS
-    events = GLOBAL_EVENTS if GLOBAL_EVENTS else fetch_freerolls()
-    now = datetime.now()
-    
+def snapshot_minute(now: datetime):
+    """Cache key part: rendered answers change with the snapshot and the clock minute"""
+    return (SNAPSHOT.version, now.replace(second=0, microsecond=0))
+
+def render_today(events: List[TournamentEvent], now: datetime) -> List[str]:
     # Events in the next 24 hours (now + 24 hours)
     next_24h_cutoff = now + timedelta(hours=24)
     next_24h = [e for e in events if now <= get_event_datetime(e) <= next_24h_cutoff]
 
     if not next_24h:
-        await send_discord_message(message.channel, "📭 No freerolls in the next 24 hours.")
-        return
+        return ["📭 No freerolls in the next 24 hours."]
 
-    await send_discord_message(message.channel, "📅 **Freerolls for the next 24 hours:**\n")
-    for e in next_24h:
-        await send_discord_message(message.channel, fmt(e))
+    return ["📅 **Freerolls for the next 24 hours:**\n"] + [fmt(e) for e in next_24h]
 
-async def send_next(message):
-    # Use globally stored events from the watcher
-    global GLOBAL_EVENTS
-    events = GLOBAL_EVENTS if GLOBAL_EVENTS else fetch_freerolls()
-    now = datetime.now()
-    
+def render_next(events: List[TournamentEvent], now: datetime) -> List[str]:
     # Filter out all-day events and get future events
     future = [e for e in events if not e['is_all_day'] and get_event_datetime(e) > now]
 
     if not future:
-        await send_discord_message(message.channel, "❌ No upcoming freeroll.")
-        return
+        return ["❌ No upcoming freeroll."]
 
     nxt = future[0]
     delta = get_event_datetime(nxt) - now
     total_minutes = int(delta.total_seconds() / 60)
     
     time_msg = f"⏰ **Starts in {total_minutes} minutes!**\n\n"
-    await send_discord_message(message.channel, "👉 **Next freeroll:**\n" + time_msg + fmt(nxt))
+    return ["👉 **Next freeroll:**\n" + time_msg + fmt(nxt)]
+
+async def send_snapshot_loading(message) -> bool:
+    """Tell the user to wait if the watcher has not scraped yet"""
+    if SNAPSHOT.refreshed_at is None:
+        await send_discord_message(message.channel, "⏳ Freerolls are still loading, try again in a minute.")
+        return True
+    return False
+
+async def send_today(message):
+    if LIVE_BOARD:
+        board_url = LIVE_BOARD.jump_url(message.channel)
+        if board_url:
+            await send_discord_message(message.channel, f"📌 Live freeroll board: {board_url}")
+            return
+
+    # Answer from the watcher's snapshot, rendered once per version and minute
+    if await send_snapshot_loading(message):
+        return
+    now = datetime.now()
+    responses = RESPONSE_CACHE.get_or_render(
+        ("!day",) + snapshot_minute(now), lambda: render_today(SNAPSHOT.events, now)
+    )
+    for content in responses:
+        await send_discord_message(message.channel, content)
+
+async def send_next(message):
+    if await send_snapshot_loading(message):
+        return
+    now = datetime.now()
+    responses = RESPONSE_CACHE.get_or_render(
+        ("!next",) + snapshot_minute(now), lambda: render_next(SNAPSHOT.events, now)
+    )
+    for content in responses:
+        await send_discord_message(message.channel, content)
 
 
 async def send_debug(message):
-    events = fetch_freerolls()
-    await send_discord_message(message.channel, f"🔧 Debug: {len(events)} freerolls loaded.")
+    # Report on the cached snapshot; never triggers a scrape
+    now = datetime.now()
+    per_source = {}
+    for e in SNAPSHOT.events:
+        per_source[e.get('source', 'n/a')] = per_source.get(e.get('source', 'n/a'), 0) + 1
+
+    def age(when):
+        return f"{int((now - when).total_seconds())}s ago" if when else "never"
+
+    lines = [
+        f"🔧 Debug: {len(SNAPSHOT.events)} freerolls loaded (snapshot v{SNAPSHOT.version})",
+        f"Last scrape: {age(SNAPSHOT.refreshed_at)}, last change: {age(SNAPSHOT.updated_at)}",
+        "Per source: " + (", ".join(f"{name} {count}" for name, count in sorted(per_source.items())) or "-"),
+    ]
+    lines.extend(DRIFT_MONITOR.summary())
+    lines.append(
+        f"Command cache: {RESPONSE_CACHE.hits} hits / {RESPONSE_CACHE.misses} misses, "
+        f"{COMMANDS.throttled} throttled"
+    )
+    if PIPELINE:
+        lines.append(f"Memory: {PIPELINE.memory.usage_mb():.1f} MB traced, {PIPELINE.memory.trips} ceiling trips")
+    await send_discord_message(message.channel, "\n".join(lines))
+
+
+async def send_profile(message):
+    # Profiling control is limited to members who can manage the server
+    permissions = getattr(message.author, "guild_permissions", None)
+    if not permissions or not permissions.manage_guild:
+        await send_discord_message(message.channel, "⛔ Only server admins can control profiling.")
+        return
+
+    args = message.content.lower().split()
+    action = args[1] if len(args) > 1 else "status"
+    if action == "on":
+        PROFILER.enable()
+        await send_discord_message(message.channel, f"🔬 Profiling on, writing to `{PROFILER.output_dir}/`.")
+    elif action == "off":
+        PROFILER.disable()
+        await send_discord_message(message.channel, "🔬 Profiling off.")
+    else:
+        state = "on" if PROFILER.enabled else "off"
+        summary = "\n".join(PROFILER.summary_lines()[:15])
+        await send_discord_message(message.channel, f"🔬 Profiling is {state}.\n```\n{summary}\n```")
+
+
+def history_overview(since: datetime):
+    """Top rooms and total row count (runs in a worker thread)"""
+    return ARCHIVE.top_rooms(since=since, limit=10), ARCHIVE.count()
+
+def history_rows(room: str, since: datetime) -> List[dict]:
+    """Latest archived versions of a room's events (runs in a worker thread)"""
+    return list(ARCHIVE.query(room=room, since=since, limit=10, newest_first=True))
+
+async def send_history(message):
+    args = message.content.split(maxsplit=1)
+    since = datetime.now() - timedelta(days=30)
+    # Archive queries grow with the history, keep them off the gateway loop
+    loop = asyncio.get_running_loop()
+
+    if len(args) == 1:
+        # Overview: most active rooms of the last 30 days
+        rooms, total = await loop.run_in_executor(None, history_overview, since)
+        if not rooms:
+            await send_discord_message(message.channel, "📭 The archive is empty.")
+            return
+        lines = [f"🏢 **{room}** - {count} freerolls" for room, count in rooms]
+        await send_discord_message(
+            message.channel,
+            f"📚 **Archive: {total} event versions stored**\n"
+            "Most active rooms in the last 30 days:\n\n" + "\n".join(lines)
+        )
+        return
+
+    # Room history: latest archived events of the given room
+    room = args[1].strip()
+    rows = await loop.run_in_executor(None, history_rows, room, since)
+    if not rows:
+        await send_discord_message(message.channel, f"📭 No archived freerolls for **{room}**.")
+        return
+    lines = []
+    for row in rows:
+        start = datetime.fromisoformat(row["start"])
+        when = start.strftime('%d.%m.%Y') + (" (all day)" if row["is_all_day"] else start.strftime(' %H:%M'))
+        lines.append(f"🕒 {when} - **{row['name']}** - {row['prize']} - 🔑 {row['password']}")
+    await send_discord_message(
+        message.channel,
+        f"📚 **Latest archived freerolls for {room}:**\n\n" + "\n".join(lines)
+    )
 
 
 async def send_test(message):
     await send_discord_message(message.channel, "🧪 Test OK! The bot is running.")
 
 
+def format_offset(minutes: int) -> str:
+    """Alert offset as text, e.g. 60 -> 1 hour, 10 -> 10 minutes"""
+    if minutes % 60 == 0:
+        hours = minutes // 60
+        return f"{hours} hour" if hours == 1 else f"{hours} hours"
+    return f"{minutes} minute" if minutes == 1 else f"{minutes} minutes"
+
 async def send_help(message):
+    # The last (closest) alert is the urgent one, as in process_cycle
+    alert_lines = [
+        f"{'🚨' if index == len(ALERT_OFFSETS) - 1 else '⏰'} {format_offset(offset)} before start"
+        for index, offset in enumerate(ALERT_OFFSETS)
+    ]
     help_text = (
         "🃏 **Freeroll Bot Commands:**\n\n"
         "**!day** - Freerolls for the next 24 hours\n"
         "**!next** - Details of the nearest freeroll\n"
+        "**!history [room]** - Archived freerolls (optionally for one room)\n"
+        "**!debug** - Snapshot and parser status\n"
         "**!test** - Check bot operation\n"
         "**!help** - This help message\n\n"
         "The bot automatically monitors freerolls and sends notifications:\n"
-        "⏰ 1 hour before start\n"
-        "🚨 10 minutes before start"
+        + "\n".join(alert_lines)
     )
     await send_discord_message(message.channel, help_text)
 
+# Prefix dispatch table with per-user / per-channel rate limits
+COMMANDS = CommandRouter()
+COMMANDS.register("!day", send_today)
+COMMANDS.register("!next", send_next)
+COMMANDS.register("!history", send_history)
+COMMANDS.register("!debug", send_debug)
+COMMANDS.register("!profile", send_profile)
+COMMANDS.register("!test", send_test)
+COMMANDS.register("!help", send_help)
+
+# Rendered !day / !next answers, keyed by snapshot version and minute
+RESPONSE_CACHE = ResponseCache()
+
 # ------------------------------------------------------
 # STATUS ROTATOR (presence cycle)
 # ------------------------------------------------------
@@ -305,131 +507,441 @@ async def status_rotator():
 # WATCHER – Daily summary and alerts
 # ------------------------------------------------------
 # Store sent alerts
-# Key: (datetime, name, alert_type) where alert_type: 'daily', '1hour', '10min'
+# Key: (datetime, name, alert_type) where alert_type is e.g. '60min', '10min'
 SENT_ALERTS = set()
 
 # Globally stored events from the watcher
 GLOBAL_EVENTS: List[TournamentEvent] = []
 
-async def watcher():
-    global SENT_ALERTS, GLOBAL_EVENTS
-    await bot.wait_until_ready()
+# Every scraped snapshot version is kept here for historical queries
+ARCHIVE = TournamentArchive(ARCHIVE_FILE)
+
+# Versioned copy of GLOBAL_EVENTS for consumers that cache rendered output
+SNAPSHOT = EventSnapshot()
+
+LIVE_BOARD = LiveBoard(LIVE_BOARD_FILE, LIVE_BOARD_REFRESH) if SUMMARY_MODE == "live" else None
+
+# Staged runtime: scrape/parse/merge stages and a bounded send queue
+PIPELINE = None
+SENDER = None
+if RUNTIME_CONFIG:
+    PIPELINE = Pipeline(
+        lambda: SOURCES,
+        lambda: wait_for_next_cycle(),
+        DRIFT_MONITOR,
+        parse_workers=RUNTIME_CONFIG["parse_workers"],
+        queue_size=RUNTIME_CONFIG["queue_size"],
+        memory_limit_mb=RUNTIME_CONFIG["memory_limit_mb"]
+    )
+    SENDER = Sender(send_discord_message, RUNTIME_CONFIG["send_queue_size"])
+
+FEED_SERVER = None
+if FEED_SERVER_CONFIG:
+    FEED_SERVER = FeedServer(
+        SNAPSHOT,
+        host=FEED_SERVER_CONFIG.get("host", "127.0.0.1"),
+        port=FEED_SERVER_CONFIG.get("port", 8080)
+    )
+
+def resolve_channel():
+    """Look up the configured channel (re-read every cycle so config changes apply)"""
     channel_obj = bot.get_channel(CHANNEL_ID)
     
     if channel_obj is None:
         print(f"Error: Channel with ID {CHANNEL_ID} not found")
-        return
+        return None
     
     # Type narrowing - ensure we have a text channel
     if not isinstance(channel_obj, (discord.TextChannel, discord.Thread)):
         print(f"Error: Channel {CHANNEL_ID} is not a text channel or thread")
-        return
+        return None
     
-    channel = cast(Union[discord.TextChannel, discord.Thread], channel_obj)
+    return cast(Union[discord.TextChannel, discord.Thread], channel_obj)
 
-    last_daily_send = None
+def notif_role(channel):
+    """The @notif_poker role of the channel's guild, if any"""
+    if isinstance(channel, discord.TextChannel) and channel.guild:
+        return discord.utils.get(channel.guild.roles, name="notif_poker")
+    return None
 
-    while True:
-        events = fetch_freerolls()
-        GLOBAL_EVENTS = events  # Store events globally
-        now = datetime.now()
-        today = now.date()
+async def push_password(channel, role, e: TournamentEvent, previous: dict):
+    """Send only the newly published password of an already announced event
+
+    The event is recorded as sent once the message went out.
+    """
+    # The watcher and the password watch may both have found this change
+    if event_already_sent(e, load_sent_events()):
+        return
+    text = fmt_password(e, previous)
+    if role:
+        text = f"{role.mention} " + text
+    await queue_event_message(channel, text, e)
+
+async def wait_for_next_cycle():
+    """Sleep for the poll interval, waking early when the config changes"""
+    global WATCHER_WAKE
+    if WATCHER_WAKE is None:
+        WATCHER_WAKE = asyncio.Event()
+    try:
+        await asyncio.wait_for(WATCHER_WAKE.wait(), timeout=POLL_INTERVAL)
+    except asyncio.TimeoutError:
+        pass
+    WATCHER_WAKE.clear()
+
+async def process_cycle(events: List[TournamentEvent], fresh: List[TournamentEvent]):
+    """Publish one scraped snapshot: summary, alerts and bookkeeping
+
+    fresh holds the events actually parsed this cycle; the rest are last good
+    events of backed-off or failed sources.
+    """
+    global SENT_ALERTS, GLOBAL_EVENTS
+    GLOBAL_EVENTS = events  # Store events globally
+    now = datetime.now()
+    with span("snapshot"):
+        snapshot_changed = SNAPSHOT.update(events, now)
+
+    # Archive what was seen this cycle in one batched write; replayed last good
+    # events would inflate last_seen/times_seen during drift or outages
+    with span("archive"):
+        try:
+            ARCHIVE.record_snapshot(fresh, scraped_at=now)
+        except Exception as e:
+            print(f"Error archiving events: {e}")
+    today = now.date()
 
+    channel = resolve_channel()
+    if channel is None:
+        return
+
+    # Parser drift / recovery notices for the admins
+    for alert in DRIFT_MONITOR.pop_alerts():
+        admin_channel = bot.get_channel(ADMIN_CHANNEL_ID) if ADMIN_CHANNEL_ID else None
+        await queue_discord_message(admin_channel or channel, alert)
+
+    with span("sent_store"):
         # Cleanup: remove events older than today
         cleanup_old_events()
-        
+
         # Load sent events
         sent_events = load_sent_events()
-        
-        # Events in the next 24 hours (now + 24 hours)
-        next_24h_cutoff = now + timedelta(hours=24)
-        next_24h = [e for e in events if now <= get_event_datetime(e) <= next_24h_cutoff]
-        
-        # Only send events that haven't been sent yet (deep compare)
-        new_events = [e for e in next_24h if not event_already_sent(e, sent_events)]
-        
-        if new_events:
+
+    # Events in the next 24 hours (now + 24 hours)
+    next_24h_cutoff = now + timedelta(hours=24)
+    next_24h = [e for e in events if now <= get_event_datetime(e) <= next_24h_cutoff]
+
+    # Only send events that haven't been sent yet (deep compare)
+    new_events = [e for e in next_24h if not event_already_sent(e, sent_events)]
+
+    # An announced event whose password appeared or changed is not re-posted;
+    # only the password is pushed
+    password_changes = []
+    for e in new_events:
+        previous = find_password_change(e, sent_events)
+        if previous is not None:
+            password_changes.append((e, previous))
+    if password_changes:
+        changed_ids = {id(e) for e, _ in password_changes}
+        new_events = [e for e in new_events if id(e) not in changed_ids]
+
+    role = notif_role(channel)
+
+    with span("passwords"):
+        for e, previous in password_changes:
+            if is_password_pending(e):
+                add_sent_event(e)  # Password withdrawn: nothing to push
+            else:
+                await push_password(channel, role, e, previous)
+
+    with span("summary"):
+        if LIVE_BOARD:
+            # Live mode: edit the board in place instead of posting each event
+            await LIVE_BOARD.update(
+                channel, next_24h, now, snapshot_changed,
+                send=send_discord_message, edit=edit_discord_message
+            )
+            for e in new_events:
+                add_sent_event(e)
+        elif new_events:
             # Check if we've already sent a daily summary today
             # (is there an event with today's date in the sent list)
             has_sent_today = any(
                 datetime.fromisoformat(sent["date"]).date() == today 
                 for sent in sent_events
             )
-            
+
             # If we've already sent a daily summary today, send with "New daily event" title
             if has_sent_today:
-                await send_discord_message(channel, "🆕 **New daily event:**\n")
+                await queue_discord_message(channel, "🆕 **New daily event:**\n")
             else:
-                await send_discord_message(channel, "📅 **Freerolls for the next 24 hours:**\n")
-            
+                await queue_discord_message(channel, "📅 **Freerolls for the next 24 hours:**\n")
+
             for e in new_events:
-                await send_discord_message(channel, fmt(e))
-                # Add to the sent events list
-                add_sent_event(e)
+                # Added to the sent events list only once the send succeeded
+                await queue_event_message(channel, fmt(e), e)
 
-        # Future events for alerts
-        # Filter out all-day events from alerts (1h and 10min warnings)
-        next_24h_cutoff = now + timedelta(hours=24)
-        next_24h_timed = [e for e in events if not e['is_all_day'] and now <= get_event_datetime(e) <= next_24h_cutoff]
-        
-        role = None
-        if isinstance(channel, discord.TextChannel) and channel.guild:
-            role = discord.utils.get(channel.guild.roles, name="notif_poker")
+    # Future events for alerts
+    # Filter out all-day events from alerts (ALERT_OFFSETS warnings)
+    next_24h_cutoff = now + timedelta(hours=24)
+    next_24h_timed = [e for e in events if not e['is_all_day'] and now <= get_event_datetime(e) <= next_24h_cutoff]
 
+    with span("alerts"):
         for nxt in next_24h_timed:
             delta = get_event_datetime(nxt) - now
             total_minutes = int(delta.total_seconds() / 60)
 
-            # 1 hour alert (less than 60 minutes but more than 10 minutes)
-            if total_minutes < 60 and total_minutes > 10:
-                event_key = (get_event_datetime(nxt), nxt["name"], '1hour')
-                if event_key not in SENT_ALERTS:
-                    SENT_ALERTS.add(event_key)
-                    if role:
-                        await send_discord_message(
-                            channel,
-                            f"{role.mention} ⏰ **Starts in {total_minutes} minutes!**\n\n" + fmt(nxt)
-                        )
-                    else:
-                        await send_discord_message(
-                            channel,
-                            f"⏰ **Starts in {total_minutes} minutes!**\n\n" + fmt(nxt)
-                        )
-
-            # 10 minute alert (less than 10 minutes and not yet sent)
-            if total_minutes < 10 and total_minutes >= 0:
-                event_key = (get_event_datetime(nxt), nxt["name"], '10min')
-                if event_key not in SENT_ALERTS:
-                    SENT_ALERTS.add(event_key)
-                    if role:
-                        await send_discord_message(
-                            channel,
-                            f"{role.mention} 🚨 **ATTENTION! Starts in {total_minutes} minutes!**\n\n" + fmt(nxt)
-                        )
-                    else:
-                        await send_discord_message(
-                            channel,
-                            f"🚨 **ATTENTION! Starts in {total_minutes} minutes!**\n\n" + fmt(nxt)
-                        )
-
-        # Memory cleanup: remove expired events
-        cutoff_time = now - timedelta(hours=2)
-        SENT_ALERTS = {
-            (dt, name, alert_type) for (dt, name, alert_type) in SENT_ALERTS 
-            if dt > cutoff_time
-        }
-
-        await asyncio.sleep(300)  # Wait 5 minutes
+            # Each offset covers the minutes between it and the next smaller offset,
+            # e.g. [60, 10]: 1 hour alert for 10 < m < 60, 10 minute alert for 0 <= m < 10
+            for index, offset in enumerate(ALERT_OFFSETS):
+                lower = ALERT_OFFSETS[index + 1] if index + 1 < len(ALERT_OFFSETS) else -1
+                if not (lower < total_minutes < offset):
+                    continue
+
+                event_key = (get_event_datetime(nxt), nxt["name"], f'{offset}min')
+                if event_key in SENT_ALERTS:
+                    continue
+                SENT_ALERTS.add(event_key)
+
+                # The last (closest) alert is the urgent one
+                if index == len(ALERT_OFFSETS) - 1:
+                    text = f"🚨 **ATTENTION! Starts in {total_minutes} minutes!**\n\n" + fmt(nxt)
+                else:
+                    text = f"⏰ **Starts in {total_minutes} minutes!**\n\n" + fmt(nxt)
+                if role:
+                    text = f"{role.mention} " + text
+                await queue_discord_message(channel, text)
+
+    # Memory cleanup: remove expired events
+    cutoff_time = now - timedelta(hours=2)
+    SENT_ALERTS = {
+        (dt, name, alert_type) for (dt, name, alert_type) in SENT_ALERTS 
+        if dt > cutoff_time
+    }
+
+async def watcher():
+    await bot.wait_until_ready()
+
+    while True:
+        if PIPELINE:
+            # In the staged runtime the scrape stage paces the cycles
+            events, fresh = await PIPELINE.next_snapshot()
+            with PROFILER.cycle("watcher"):
+                await process_cycle(events, fresh)
+            continue
+
+        with PROFILER.cycle("watcher"):
+            with span("scrape"):
+                # Scrape off the event loop so gateway heartbeats keep running;
+                # the copied context attributes the thread's spans to this cycle
+                events, fresh = await asyncio.get_running_loop().run_in_executor(
+                    None, contextvars.copy_context().run, fetch_freerolls
+                )
+            await process_cycle(events, fresh)
+        await wait_for_next_cycle()
+
+# ------------------------------------------------------
+# PASSWORD WATCH – fast path for passwords published shortly before start
+# ------------------------------------------------------
+async def check_pending_passwords():
+    """Re-fetch only the sources that have soon-starting events without a password"""
+    global GLOBAL_EVENTS
+    now = datetime.now()
+    window_start = now - timedelta(minutes=10)  # Late registration is still possible
+    window_end = now + timedelta(minutes=PASSWORD_WATCH_WINDOW)
+    pending = [
+        e for e in SNAPSHOT.events
+        if not e['is_all_day'] and is_password_pending(e)
+        and window_start <= get_event_datetime(e) <= window_end
+    ]
+    sources = {e.get('source') for e in pending if e.get('source') in SOURCES}
+    if not sources:
+        return
+
+    loop = asyncio.get_running_loop()
+    refetched: List[TournamentEvent] = []
+    fresh: List[TournamentEvent] = []
+    with PROFILER.cycle("passwords"):
+        for name in sorted(sources):
+            with span("password_watch.fetch"):
+                if PIPELINE:
+                    # Staged runtime: parse in the worker processes, not in the bot
+                    source_events, is_fresh = await PIPELINE.refresh_source(name, SOURCES[name])
+                else:
+                    source_events, is_fresh = await loop.run_in_executor(
+                        None, contextvars.copy_context().run, fetch_source, name, SOURCES[name]
+                    )
+                refetched.extend(source_events)
+                if is_fresh:
+                    fresh.extend(source_events)
+
+        # Archive right away so a revealed password gets its real first_seen
+        with span("password_watch.archive"):
+            try:
+                ARCHIVE.record_snapshot(fresh, scraped_at=now)
+            except Exception as e:
+                print(f"Error archiving events: {e}")
+
+        # Swap in the re-fetched sources, keep the others from the last full scrape
+        merged = [e for e in GLOBAL_EVENTS if e.get('source') not in sources] + refetched
+        merged.sort(key=lambda x: get_event_datetime(x))
+        GLOBAL_EVENTS = merged
+        snapshot_changed = SNAPSHOT.update(merged, now)
+
+        channel = resolve_channel()
+        if channel is None:
+            return
+
+        if LIVE_BOARD and snapshot_changed:
+            # The next full cycle sees an unchanged snapshot, so edit the board now
+            with span("password_watch.board"):
+                next_24h_cutoff = now + timedelta(hours=24)
+                next_24h = [e for e in merged if now <= get_event_datetime(e) <= next_24h_cutoff]
+                await LIVE_BOARD.update(
+                    channel, next_24h, now, True,
+                    send=send_discord_message, edit=edit_discord_message
+                )
+
+        role = notif_role(channel)
+        pending_keys = {identity_key(event_to_dict(e)) for e in pending}
+        sent_events = load_sent_events()
+
+        for e in fresh:
+            if is_password_pending(e) or identity_key(event_to_dict(e)) not in pending_keys:
+                continue
+            if event_already_sent(e, sent_events):
+                continue
+            previous = find_password_change(e, sent_events)
+            # Events never announced are left to the full cycle
+            if previous is None:
+                continue
+            await push_password(channel, role, e, previous)
+
+async def password_watcher():
+    await bot.wait_until_ready()
+    while True:
+        await asyncio.sleep(PASSWORD_POLL_INTERVAL or 60)
+        if not PASSWORD_POLL_INTERVAL:
+            continue  # Disabled; keep the task so a config reload can turn it on
+        try:
+            await check_pending_passwords()
+        except Exception as e:
+            print(f"Error checking pending passwords: {e}")
+
+# ------------------------------------------------------
+# CONFIG HOT RELOAD
+# ------------------------------------------------------
+# Set to wake the watcher before its poll interval has elapsed
+# (created inside the running loop by wait_for_next_cycle)
+WATCHER_WAKE: Optional[asyncio.Event] = None
+
+CONFIG_WATCHER = ConfigWatcher(CONFIG_PATH, config)
+
+def apply_watcher_config(new, old, changed):
+    """Swap sources, channel, interval and alert offsets in one step
+
+    The watcher reads these globals at the start of each cycle, so it picks
+    up a consistent set; caches, sent alerts and the snapshot are kept.
+    """
+    global config, CHANNEL_ID, ADMIN_CHANNEL_ID, SOURCES, POLL_INTERVAL, ALERT_OFFSETS
+    global PASSWORD_POLL_INTERVAL, PASSWORD_WATCH_WINDOW
+    config = new
+    CHANNEL_ID = new["channel_id"]
+    ADMIN_CHANNEL_ID = new["admin_channel_id"]
+    SOURCES = dict(new["sources"])
+    POLL_INTERVAL = new["poll_interval"]
+    ALERT_OFFSETS = sorted(new["alert_offsets"], reverse=True)
+    PASSWORD_POLL_INTERVAL = new["password_poll_interval"]
+    PASSWORD_WATCH_WINDOW = new["password_watch_window"]
+    if WATCHER_WAKE and changed & {"sources", "channel_id", "poll_interval"}:
+        WATCHER_WAKE.set()
+
+def apply_summary_config(new, old, changed):
+    """Switch between post and live summary mode"""
+    global SUMMARY_MODE, LIVE_BOARD_REFRESH, LIVE_BOARD
+    SUMMARY_MODE = new["summary_mode"]
+    LIVE_BOARD_REFRESH = new["live_board_refresh"]
+    if SUMMARY_MODE != "live":
+        LIVE_BOARD = None
+    elif LIVE_BOARD is None:
+        LIVE_BOARD = LiveBoard(LIVE_BOARD_FILE, LIVE_BOARD_REFRESH)
+    else:
+        LIVE_BOARD.refresh_interval = LIVE_BOARD_REFRESH
+
+def apply_archive_config(new, old, changed):
+    """Reopen the history archive at its new location"""
+    global ARCHIVE_FILE, ARCHIVE
+    ARCHIVE_FILE = new["archive_path"]
+    new_archive = TournamentArchive(ARCHIVE_FILE)
+    ARCHIVE.close()
+    ARCHIVE = new_archive
+
+async def apply_feed_config(new, old, changed):
+    """Restart only the feed server"""
+    global FEED_SERVER_CONFIG, FEED_SERVER
+    FEED_SERVER_CONFIG = new["feed_server"]
+    if FEED_SERVER:
+        await FEED_SERVER.stop()
+        FEED_SERVER = None
+    if FEED_SERVER_CONFIG:
+        FEED_SERVER = FeedServer(
+            SNAPSHOT,
+            host=FEED_SERVER_CONFIG.get("host", "127.0.0.1"),
+            port=FEED_SERVER_CONFIG.get("port", 8080)
+        )
+        await FEED_SERVER.start()
+
+def apply_runtime_config(new, old, changed):
+    """Resize the parse pool and memory ceiling; other runtime settings need a restart"""
+    global RUNTIME_CONFIG
+    old_runtime, new_runtime = RUNTIME_CONFIG, new["runtime"]
+    if not PIPELINE or not new_runtime:
+        print("Warning: enabling or disabling the staged runtime requires a restart")
+        return
+    RUNTIME_CONFIG = new_runtime
+    PIPELINE.set_parse_workers(new_runtime["parse_workers"])
+    PIPELINE.memory.limit_mb = new_runtime["memory_limit_mb"]
+    for key in ("sharded", "shard_count", "queue_size", "send_queue_size"):
+        if old_runtime.get(key) != new_runtime.get(key):
+            print(f"Warning: runtime.{key} change takes effect after a restart")
+
+def warn_token_change(new, old, changed):
+    print("Warning: discord_token changed - restart the bot to log in with the new token")
+
+CONFIG_WATCHER.subscribe(
+    ["sources", "channel_id", "admin_channel_id", "poll_interval", "alert_offsets",
+     "password_poll_interval", "password_watch_window"],
+    apply_watcher_config
+)
+CONFIG_WATCHER.subscribe(["summary_mode", "live_board_refresh"], apply_summary_config)
+CONFIG_WATCHER.subscribe(["archive_path"], apply_archive_config)
+CONFIG_WATCHER.subscribe(["feed_server"], apply_feed_config)
+CONFIG_WATCHER.subscribe(["runtime"], apply_runtime_config)
+CONFIG_WATCHER.subscribe(["discord_token"], warn_token_change)
 
 # ------------------------------------------------------
 # BOT EVENTS
 # ------------------------------------------------------
+# on_ready fires again after every reconnect; background tasks start only once
+BACKGROUND_TASKS_STARTED = False
+
 @bot.event
 async def on_ready():
+    global BACKGROUND_TASKS_STARTED
     print("Bot online:", bot.user)
 
+    if BACKGROUND_TASKS_STARTED:
+        return
+    BACKGROUND_TASKS_STARTED = True
+
     asyncio.create_task(status_rotator())
     asyncio.create_task(watcher())
+    asyncio.create_task(password_watcher())
+    asyncio.create_task(CONFIG_WATCHER.run())
+
+    if FEED_SERVER and not FEED_SERVER.is_serving():
+        try:
+            await FEED_SERVER.start()
+        except OSError as e:
+            print(f"Error starting feed server: {e}")
 
 
 @bot.event
@@ -437,20 +949,13 @@ async def on_message(message):
     if message.author == bot.user:
         return
 
-    msg = message.content.lower()
-
-    if msg == "!day":
-        await send_today(message)
-
-    if msg == "!next":
-        await send_next(message)
-
-    if msg == "!test":
-        await send_test(message)
+    await COMMANDS.dispatch(message)
 
-    if msg == "!help":
-        await send_help(message)
 
+def main():
+    """Run the bot until it is stopped"""
+    bot.run(TOKEN)
 
 
-bot.run(TOKEN)
+if __name__ == "__main__":
+    main()
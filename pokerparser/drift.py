@@ -0,0 +1,220 @@
+"""Parser drift detection: structural page fingerprints and parse-ratio health per source"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from .models import TournamentEvent
+
+
+# Below this share of sampled items carrying a required selector, a changed
+# layout is treated as broken without parsing the items
+MIN_ITEM_COVERAGE = 0.5
+
+
+def content_children(container) -> int:
+    """Number of element children where the container's content branches out
+
+    Layout wrappers with a single element child are descended, so a list
+    nested in a few divs is counted by its entries rather than as one child.
+    """
+    node = container
+    while True:
+        children = node.find_all(True, recursive=False)
+        if len(children) != 1:
+            return len(children)
+        node = children[0]
+
+
+def structural_fingerprint(page_checks: Dict[str, bool], items: List,
+                           item_selectors: Tuple[str, ...], sample: int = 10) -> Tuple[str, Dict[str, float]]:
+    """Hash of a page's structure, return (fingerprint, per-item selector coverage)
+
+    page_checks are landmarks the parser already looked up (present or not).
+    Per-item selectors are only tried on the first few items. The hash only
+    takes whether each one is present on most of them, so a single item
+    missing a field does not change the fingerprint, while renamed classes or
+    restructured markup do. The raw coverage is returned for layout_broken().
+    """
+    sampled = items[:sample]
+    coverage: Dict[str, float] = {}
+    if sampled:
+        for selector in item_selectors:
+            found = sum(1 for item in sampled if item.select_one(selector) is not None)
+            coverage[selector] = found / len(sampled)
+    parts = [f"{name}={int(present)}" for name, present in page_checks.items()]
+    parts += [f"{selector}={int(value >= MIN_ITEM_COVERAGE)}" for selector, value in coverage.items()]
+    fingerprint = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+    return fingerprint, coverage
+
+
+def layout_broken(baseline: Optional[str], fingerprint: str, coverage: Dict[str, float]) -> bool:
+    """True on a clear layout change that makes parsing the items pointless
+
+    That is a fingerprint different from the baseline together with a
+    required per-item selector missing on most sampled items.
+    """
+    if baseline is None or fingerprint == baseline or not coverage:
+        return False
+    return min(coverage.values()) < MIN_ITEM_COVERAGE
+
+
+class SourceHealth:
+    """Drift state and counters of a single source"""
+
+    def __init__(self, baseline: Optional[str] = None):
+        self.baseline = baseline
+        self.fingerprint: Optional[str] = None
+        self.items = 0
+        self.parsed = 0
+        self.drifting = False
+        self.failures = 0                        # Consecutive unhealthy cycles
+        self.skip_until: Optional[datetime] = None
+        self.drift_count = 0                     # Metric: unhealthy parses seen
+        self.fingerprint_changes = 0             # Metric: baseline replaced by a healthy new layout
+        self.last_good: List[TournamentEvent] = []
+        self.last_good_at: Optional[datetime] = None
+
+    @property
+    def ratio(self) -> float:
+        return self.parsed / self.items if self.items else 0.0
+
+
+class DriftMonitor:
+    """Decides per source whether a parse result can be trusted
+
+    A parse is healthy when at least min_ratio of the page's items produced
+    events, or when the item list is present and truly empty (a day without
+    freerolls). A missing list, a list whose entries no longer match the item
+    selector, or a layout the parser rejected up front via layout_broken(),
+    is unhealthy. On an unhealthy parse the source is flagged as drifting,
+    an admin alert is queued once, the last good events keep being served and
+    the source is backed off exponentially (base_backoff doubling up to
+    max_backoff) so a broken page is not re-fetched and re-parsed every cycle.
+    """
+
+    def __init__(self, baseline_file: str = "parser_baseline.json", min_ratio: float = 0.5,
+                 base_backoff: int = 300, max_backoff: int = 3600):
+        self.baseline_file = baseline_file
+        self.min_ratio = min_ratio
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.sources: Dict[str, SourceHealth] = {}
+        self.alerts: List[str] = []
+        self._load_baselines()
+
+    def _load_baselines(self) -> None:
+        if not os.path.exists(self.baseline_file):
+            return
+        try:
+            with open(self.baseline_file, 'r', encoding='utf-8') as f:
+                for source, baseline in json.load(f).items():
+                    self.sources[source] = SourceHealth(baseline)
+        except Exception as e:
+            print(f"Error loading parser baselines: {e}")
+
+    def _save_baselines(self) -> None:
+        try:
+            with open(self.baseline_file, 'w', encoding='utf-8') as f:
+                json.dump({name: h.baseline for name, h in self.sources.items() if h.baseline},
+                          f, indent=2)
+        except Exception as e:
+            print(f"Error saving parser baselines: {e}")
+
+    def health(self, source: str) -> SourceHealth:
+        if source not in self.sources:
+            self.sources[source] = SourceHealth()
+        return self.sources[source]
+
+    def should_fetch(self, source: str, now: datetime) -> bool:
+        """False while the source is backed off after drift"""
+        skip_until = self.health(source).skip_until
+        return skip_until is None or now >= skip_until
+
+    def last_good(self, source: str) -> List[TournamentEvent]:
+        return self.health(source).last_good
+
+    def baseline(self, source: str) -> Optional[str]:
+        """Known-good fingerprint handed to the parser for its fail-fast check"""
+        return self.health(source).baseline
+
+    def record(self, source: str, events: List[TournamentEvent], stats: Dict,
+               now: datetime) -> List[TournamentEvent]:
+        """Check one parse result, return the events that should be served"""
+        h = self.health(source)
+        h.items = stats.get("items", 0)
+        h.parsed = len(events)
+        h.fingerprint = stats.get("fingerprint")
+        broken = stats.get("layout_broken", False)
+
+        if broken:
+            healthy = False
+        elif h.items == 0:
+            # Entries in the container that aren't recognized as items mean a renamed item class
+            healthy = stats.get("container", False) and not stats.get("container_children", 0)
+        else:
+            healthy = h.parsed > 0 and h.ratio >= self.min_ratio
+
+        if healthy:
+            # An empty list has no item structure to learn a baseline from
+            if h.items > 0 and h.baseline != h.fingerprint:
+                if h.baseline is not None:
+                    h.fingerprint_changes += 1
+                    print(f"[metric] parser_fingerprint_change source={source} "
+                          f"old={h.baseline} new={h.fingerprint} ratio={h.ratio:.2f}")
+                    self.alerts.append(
+                        f"ℹ️ Page layout of **{source}** changed ({h.baseline} -> {h.fingerprint}) "
+                        f"but still parses {h.parsed}/{h.items} items; adopted as the new baseline."
+                    )
+                h.baseline = h.fingerprint
+                self._save_baselines()
+            if h.drifting:
+                self.alerts.append(
+                    f"✅ Parser for **{source}** recovered: {h.parsed}/{h.items} items parsed."
+                )
+            h.drifting = False
+            h.failures = 0
+            h.skip_until = None
+            # An empty day is served as such, but once the source is known to have
+            # items the last real list stays available as fallback for later drift
+            if events or h.baseline is None:
+                h.last_good = events
+                h.last_good_at = now
+            return events
+
+        h.drift_count += 1
+        h.failures += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (h.failures - 1))
+        h.skip_until = now + timedelta(seconds=backoff)
+        layout = "unchanged" if h.fingerprint == h.baseline else f"{h.baseline} -> {h.fingerprint}"
+        if broken:
+            layout += ", item parsing skipped"
+        print(f"[metric] parser_drift source={source} items={h.items} parsed={h.parsed} "
+              f"fingerprint={layout} backoff={backoff}s")
+
+        if not h.drifting:
+            h.drifting = True
+            since = h.last_good_at.strftime('%H:%M %d.%m.%Y') if h.last_good_at else "never"
+            self.alerts.append(
+                f"⚠️ Parser drift on **{source}**: {h.parsed}/{h.items} items parsed, "
+                f"page layout {layout}. Serving last good data ({len(h.last_good)} events, from {since}) "
+                f"and backing off."
+            )
+        return h.last_good
+
+    def pop_alerts(self) -> List[str]:
+        """Return and clear queued admin alerts"""
+        alerts, self.alerts = self.alerts, []
+        return alerts
+
+    def summary(self) -> List[str]:
+        """One status line per source"""
+        lines = []
+        for name, h in sorted(self.sources.items()):
+            state = "⚠️ drifting" if h.drifting else "✅ ok"
+            lines.append(
+                f"{name}: {state}, parsed {h.parsed}/{h.items}, fingerprint {h.fingerprint or '-'}, "
+                f"drifts {h.drift_count}, layout changes {h.fingerprint_changes}"
+            )
+        return lines
@@ -0,0 +1,296 @@
+"""Embedded HTTP server publishing the current snapshot as JSON and iCal
+
+Endpoints:
+    /events.json  - events as JSON
+    /events.ics   - events as an iCalendar feed
+    /health       - snapshot version and age
+
+Filters (query parameters, combinable): room, source, date (YYYY-MM-DD),
+password=1 (only events with a published password).
+
+Bodies are rendered once per snapshot version and filter combination,
+stored together with their gzip variant and ETag, so repeated polling
+only costs a dictionary lookup (or a 304).
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+from .models import TournamentEvent, event_to_dict, is_password_pending
+from .snapshot import EventSnapshot
+
+BUDAPEST_TZ = timezone(timedelta(hours=1))
+FILTER_KEYS = ("room", "source", "date", "password")
+MAX_CACHED_RESPONSES = 256
+MAX_HEADER_BYTES = 16 * 1024
+KEEPALIVE_TIMEOUT = 15
+
+
+class CachedResponse:
+    """A pre-serialized body with its gzip variant and ETags"""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.content_type = content_type
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        tag = hashlib.sha1(body).hexdigest()[:20]
+        self.etag = f'"{tag}"'
+        self.gzip_etag = f'"{tag}-gz"'
+
+
+# ------------------------------------------------------
+# RENDERING
+# ------------------------------------------------------
+def filter_events(events: List[TournamentEvent], filters: Dict[str, str]) -> List[TournamentEvent]:
+    """Apply the supported query filters to an event list"""
+    room = filters.get("room", "").lower()
+    source = filters.get("source", "").lower()
+    day = filters.get("date", "")
+    only_password = filters.get("password", "") in ("1", "true", "yes")
+
+    result = []
+    for e in events:
+        if room and e["room"].lower() != room:
+            continue
+        if source and e.get("source", "").lower() != source:
+            continue
+        if day and e["date"].isoformat() != day:
+            continue
+        if only_password and is_password_pending(e):
+            continue
+        result.append(e)
+    return result
+
+
+def render_json(events: List[TournamentEvent], snapshot: EventSnapshot) -> bytes:
+    payload = {
+        "version": snapshot.version,
+        "updated_at": snapshot.updated_at.isoformat(timespec="seconds") if snapshot.updated_at else None,
+        "count": len(events),
+        "events": [event_to_dict(e) for e in events],
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _ics_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;")
+        .replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Fold a content line to 75 octets as required by RFC 5545"""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for ch in line:
+        ch_size = len(ch.encode("utf-8"))
+        if size + ch_size > limit:
+            parts.append(current)
+            current = ""
+            size = 0
+            limit = 74  # Continuation lines start with a space
+        current += ch
+        size += ch_size
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def render_ics(events: List[TournamentEvent], snapshot: EventSnapshot) -> bytes:
+    stamp_source = snapshot.updated_at or datetime.now()
+    dtstamp = stamp_source.replace(tzinfo=BUDAPEST_TZ).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Botzilla//Poker Freerolls//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Poker freerolls",
+    ]
+    for e in events:
+        data = event_to_dict(e)
+        uid_source = "|".join([data["source"], data["date"], data["time"] or "", data["room"], data["name"]])
+        uid = hashlib.sha1(uid_source.encode("utf-8")).hexdigest()
+        lines.append("BEGIN:VEVENT")
+        lines.append(f"UID:{uid}@pokerparser")
+        lines.append(f"DTSTAMP:{dtstamp}")
+        if e["is_all_day"] or e["time"] is None:
+            lines.append(f"DTSTART;VALUE=DATE:{e['date'].strftime('%Y%m%d')}")
+        else:
+            start = datetime.combine(e["date"], e["time"]).replace(tzinfo=BUDAPEST_TZ)
+            lines.append(f"DTSTART:{start.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}")
+        lines.append(f"SUMMARY:{_ics_escape(e['room'] + ' - ' + e['name'])}")
+        description = f"Prize: {e['prize']}\nPassword: {e['password']}\nSource: {data['source']}"
+        lines.append(f"DESCRIPTION:{_ics_escape(description)}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_ics_fold(line) for line in lines) + "\r\n").encode("utf-8")
+
+
+ROUTES = {
+    "/events.json": (render_json, "application/json; charset=utf-8"),
+    "/events.ics": (render_ics, "text/calendar; charset=utf-8"),
+}
+
+
+# ------------------------------------------------------
+# SERVER
+# ------------------------------------------------------
+class FeedServer:
+    """Minimal asyncio HTTP/1.1 server for the snapshot feeds"""
+
+    def __init__(self, snapshot: EventSnapshot, host: str = "127.0.0.1", port: int = 8080):
+        self.snapshot = snapshot
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cache: Dict[Tuple[str, Tuple], CachedResponse] = {}
+        self._cache_version = -1
+
+    def is_serving(self) -> bool:
+        return self._server is not None and self._server.is_serving()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"Feed server listening on http://{self.host}:{self.port}/")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def get_response(self, path: str, filters: Dict[str, str]) -> Optional[CachedResponse]:
+        """Return the cached rendering for path + filters, building it if needed"""
+        route = ROUTES.get(path)
+        if route is None:
+            return None
+
+        if self._cache_version != self.snapshot.version:
+            # New snapshot: drop stale bodies and pre-render the unfiltered feeds
+            self._cache = {}
+            self._cache_version = self.snapshot.version
+            for route_path, (render, content_type) in ROUTES.items():
+                body = render(self.snapshot.events, self.snapshot)
+                self._cache[(route_path, ())] = CachedResponse(body, content_type)
+
+        key = (path, tuple(sorted((k, v) for k, v in filters.items() if k in FILTER_KEYS and v)))
+        cached = self._cache.get(key)
+        if cached is None:
+            if len(self._cache) >= MAX_CACHED_RESPONSES:
+                # Arbitrary filter combinations must not grow the cache unbounded
+                self._cache = {k: v for k, v in self._cache.items() if not k[1]}
+            render, content_type = route
+            body = render(filter_events(self.snapshot.events, dict(key[1])), self.snapshot)
+            cached = CachedResponse(body, content_type)
+            self._cache[key] = cached
+        return cached
+
+    def _health(self) -> bytes:
+        snap = self.snapshot
+        return json.dumps({
+            "version": snap.version,
+            "events": len(snap.events),
+            "updated_at": snap.updated_at.isoformat(timespec="seconds") if snap.updated_at else None,
+            "refreshed_at": snap.refreshed_at.isoformat(timespec="seconds") if snap.refreshed_at else None,
+        }).encode("utf-8")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._write(writer, 400, b"Bad Request", "text/plain", close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                # Request bodies are never read, so only GET/HEAD connections can be reused
+                keep_alive = (
+                    version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                    and method in ("GET", "HEAD")
+                )
+                await self._respond(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method: str, target: str, headers: Dict[str, str], keep_alive: bool) -> None:
+        close = not keep_alive
+        if method not in ("GET", "HEAD"):
+            await self._write(writer, 405, b"Method Not Allowed", "text/plain", close=close,
+                              extra={"Allow": "GET, HEAD"})
+            return
+
+        parts = urlsplit(target)
+        filters = dict(parse_qsl(parts.query))
+
+        if parts.path == "/health":
+            await self._write(writer, 200, self._health(), "application/json", close=close,
+                              head_only=method == "HEAD")
+            return
+
+        cached = self.get_response(parts.path, filters)
+        if cached is None:
+            await self._write(writer, 404, b"Not Found", "text/plain", close=close)
+            return
+
+        use_gzip = "gzip" in headers.get("accept-encoding", "").lower()
+        etag = cached.gzip_etag if use_gzip else cached.etag
+        extra = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "public, max-age=60"}
+
+        if_none_match = headers.get("if-none-match", "")
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            if "*" in tags or etag in tags or ("W/" + etag) in tags:
+                await self._write(writer, 304, b"", None, close=close, extra=extra)
+                return
+
+        if use_gzip:
+            extra["Content-Encoding"] = "gzip"
+            body = cached.gzip_body
+        else:
+            body = cached.body
+        await self._write(writer, 200, body, cached.content_type, close=close, extra=extra,
+                          head_only=method == "HEAD")
+
+    @staticmethod
+    async def _write(writer, status: int, body: bytes, content_type: Optional[str], close: bool = False,
+                     extra: Optional[Dict[str, str]] = None, head_only: bool = False) -> None:
+        reasons = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+        head = [f"HTTP/1.1 {status} {reasons.get(status, '')}"]
+        if content_type:
+            head.append(f"Content-Type: {content_type}")
+        if status != 304:
+            head.append(f"Content-Length: {len(body)}")
+        for name, value in (extra or {}).items():
+            head.append(f"{name}: {value}")
+        head.append("Connection: close" if close else "Connection: keep-alive")
+        data = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+        if not head_only and status != 304:
+            data += body
+        writer.write(data)
+        await writer.drain()
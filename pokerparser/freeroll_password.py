@@ -6,10 +6,26 @@ from bs4 import BeautifulSoup
 from typing import List, Dict, Optional
 from datetime import datetime, timezone, timedelta
 from .models import TournamentEvent
+from .drift import content_children, layout_broken, structural_fingerprint
+from .profiler import span
+
+# Selectors expected once per item; their coverage of a sample of items makes
+# up the page's structural fingerprint (time and password are legitimately
+# missing on some items, so they are left out)
+ITEM_SELECTORS = (
+    ".fpexcerpt",
+    ".fpexcerpt .exroom",
+    ".fpexcerpt .date-display-single",
+    ".fpexcerpt .exname",
+)
 
 class FreeRollPasswordParser:
     def __init__(self, url: str = "https://www.freeroll-password.com/"):
         self.url = url
+        # Known-good fingerprint; a clearly different layout skips the item loop
+        self.baseline: Optional[str] = None
+        # Filled by parse_freerolls: items on the page, parsed count, fingerprint
+        self.stats: Dict = {}
     
     def fetch_page(self) -> str:
         """Fetch the HTML content from the URL"""
@@ -22,14 +38,35 @@ class FreeRollPasswordParser:
     
     def parse_freerolls(self, html_content: str) -> List[TournamentEvent]:
         """Parse the freeroll list from HTML content"""
-        soup = BeautifulSoup(html_content, "html.parser")
-        wrapper = soup.select_one("div.pt-cv-wrapper")
+        with span("parse.freeroll-password.com.tree"):
+            soup = BeautifulSoup(html_content, "html.parser")
+            wrapper = soup.select_one("div.pt-cv-wrapper")
+            items = wrapper.select(".pt-cv-content-item") if wrapper else []
+
+        with span("parse.freeroll-password.com.fingerprint"):
+            children = content_children(wrapper) if wrapper else 0
+            page_checks = {
+                "div.pt-cv-wrapper": wrapper is not None,
+                "div.pt-cv-wrapper children": children > 0,
+            }
+            fingerprint, coverage = structural_fingerprint(page_checks, items, ITEM_SELECTORS)
+        broken = layout_broken(self.baseline, fingerprint, coverage)
+        self.stats = {"items": len(items), "parsed": 0, "fingerprint": fingerprint,
+                      "coverage": coverage, "container": wrapper is not None,
+                      "container_children": children, "layout_broken": broken}
         
-        if not wrapper:
+        if not wrapper or broken:
             return []
 
+        with span("parse.freeroll-password.com.items"):
+            events = self._parse_items(items)
+
+        self.stats["parsed"] = len(events)
+        return events
+
+    def _parse_items(self, items) -> List[TournamentEvent]:
+        """Parse the .pt-cv-content-item elements into TournamentEvents"""
         events: List[TournamentEvent] = []
-        items = wrapper.select(".pt-cv-content-item")
 
         for item in items:
             try:
@@ -125,5 +162,6 @@ class FreeRollPasswordParser:
     
     def get_tournaments(self) -> List[TournamentEvent]:
         """Fetch and parse all tournaments"""
-        html_content = self.fetch_page()
+        with span("fetch.freeroll-password.com"):
+            html_content = self.fetch_page()
         return self.parse_freerolls(html_content)
\ No newline at end of file
@@ -1,9 +1,16 @@
 import datetime as dt
+import sys
 from datetime import datetime, timezone, timedelta
 from bs4 import BeautifulSoup
 import requests
 from typing import List, Dict, Optional
 from .models import TournamentEvent
+from .drift import content_children, layout_broken, structural_fingerprint
+from .profiler import span
+
+# Selectors expected once per tournament item; their coverage of a sample of
+# items makes up the page's structural fingerprint
+ITEM_SELECTORS = ("div.col-4", "div.col-8", "div.title-room a", "span.fl-text-name")
 
 
 class FreerollParser:
@@ -11,6 +18,10 @@ class FreerollParser:
     
     def __init__(self, url: str = "https://freerollpass.com/"):
         self.url = url
+        # Known-good fingerprint; a clearly different layout skips the item loop
+        self.baseline: Optional[str] = None
+        # Filled by parse_freerolls: items on the page, parsed count, fingerprint
+        self.stats: Dict = {}
 
     def fetch_page(self) -> str:
         """Fetch the HTML content from the URL"""
@@ -21,8 +32,11 @@ class FreerollParser:
         response.raise_for_status()
         return response.text
     
-    def _calculate_timezone_offset(self, html_content: str) -> int:
-        """Calculate timezone offset by comparing server time with current Budapest time"""
+    def _calculate_timezone_offset(self, html_content: str, reference_time: Optional[datetime] = None) -> int:
+        """Calculate timezone offset by comparing server time with current Budapest time
+
+        reference_time (naive Budapest time) replaces "now" when re-parsing a saved page.
+        """
         try:
             soup = BeautifulSoup(html_content, 'lxml')
             loader_time = soup.find('div', class_='loader-time')
@@ -46,7 +60,7 @@ class FreerollParser:
             
             # Get current Budapest time (GMT+1)
             budapest_tz = timezone(timedelta(hours=1))
-            budapest_now = datetime.now(budapest_tz).replace(tzinfo=None)
+            budapest_now = reference_time or datetime.now(budapest_tz).replace(tzinfo=None)
             
             # Calculate the difference in hours between server time and Budapest time
             time_diff = server_dt - budapest_now
@@ -55,38 +69,66 @@ class FreerollParser:
             # The actual timezone offset is Budapest (GMT+1) plus the difference
             offset_hours = 1 + offset_diff
             
-            # Clamp to reasonable timezone range (-12 to +14)
-            offset_hours = max(-12, min(14, offset_hours))
+            # Outside the real timezone range the clocks can't be compared
+            # (e.g. a saved page whose mtime is its copy time): assume GMT+1
+            if not -12 <= offset_hours <= 14:
+                print(f"Warning: Implausible timezone offset GMT+{offset_hours} (server time: {server_dt_str}, Budapest time: {budapest_now.strftime('%d.%m.%Y %H:%M')}), using GMT+1", file=sys.stderr, flush=True)
+                return 1
             
-            print(f"Detected timezone offset: GMT+{offset_hours} (server time: {server_dt_str}, Budapest time: {budapest_now.strftime('%d.%m.%Y %H:%M')})", flush=True)
+            # Diagnostics go to stderr so offline re-parse output stays clean JSON Lines
+            print(f"Detected timezone offset: GMT+{offset_hours} (server time: {server_dt_str}, Budapest time: {budapest_now.strftime('%d.%m.%Y %H:%M')})", file=sys.stderr, flush=True)
             
             return offset_hours
             
         except Exception as e:
-            print(f"Warning: Failed to calculate timezone offset: {e}", flush=True)
+            print(f"Warning: Failed to calculate timezone offset: {e}", file=sys.stderr, flush=True)
             return 0  # Default to Budapest time (GMT+1)
     
-    def parse_freerolls(self, html_content: str) -> List[Dict]:
-        """Parse the freeroll list from HTML content"""
-        soup = BeautifulSoup(html_content, 'lxml')
-        freeroll_list = soup.find('ul', id='freerollList')
+    def parse_freerolls(self, html_content: str, reference_time: Optional[datetime] = None,
+                        tz_offset: Optional[int] = None) -> List[Dict]:
+        """Parse the freeroll list from HTML content
+
+        tz_offset (hours from GMT) skips the offset detection from the page's server clock.
+        """
+        with span("parse.freerollpass.com.tree"):
+            soup = BeautifulSoup(html_content, 'lxml')
+            freeroll_list = soup.find('ul', id='freerollList')
+            list_items = freeroll_list.find_all('li', class_='row') if freeroll_list else []
+
+        with span("parse.freerollpass.com.fingerprint"):
+            children = content_children(freeroll_list) if freeroll_list else 0
+            page_checks = {
+                "ul#freerollList": freeroll_list is not None,
+                "ul#freerollList children": children > 0,
+                "div.loader-time": soup.find('div', class_='loader-time') is not None,
+            }
+            fingerprint, coverage = structural_fingerprint(page_checks, list_items, ITEM_SELECTORS)
+        broken = layout_broken(self.baseline, fingerprint, coverage)
+        self.stats = {"items": len(list_items), "parsed": 0, "fingerprint": fingerprint,
+                      "coverage": coverage, "container": freeroll_list is not None,
+                      "container_children": children, "layout_broken": broken}
         
-        if not freeroll_list:
+        if not freeroll_list or broken:
             return []
         
         # Calculate timezone offset from server time
-        timezone_offset = self._calculate_timezone_offset(html_content)
+        with span("parse.freerollpass.com.timezone"):
+            if tz_offset is None:
+                timezone_offset = self._calculate_timezone_offset(html_content, reference_time)
+            else:
+                timezone_offset = tz_offset
         
         tournaments = []
-        list_items = freeroll_list.find_all('li', class_='row')
         
-        for item in list_items:
-            tournament = self._parse_tournament_item(item)
-            if tournament:
-                # Add calculated timezone offset to each tournament
-                tournament['timezone_offset'] = timezone_offset
-                tournaments.append(tournament)
+        with span("parse.freerollpass.com.items"):
+            for item in list_items:
+                tournament = self._parse_tournament_item(item)
+                if tournament:
+                    # Add calculated timezone offset to each tournament
+                    tournament['timezone_offset'] = timezone_offset
+                    tournaments.append(tournament)
         
+        self.stats["parsed"] = len(tournaments)
         return tournaments
     
     def _parse_tournament_item(self, item) -> Optional[Dict]:
@@ -180,16 +222,30 @@ class FreerollParser:
             
         except Exception as e:
             # Skip items that can't be parsed
-            print(f"Warning: Failed to parse tournament item: {e}", flush=True)
+            print(f"Warning: Failed to parse tournament item: {e}", file=sys.stderr, flush=True)
             return None
         
         return None
     
     def get_tournaments(self) -> List[TournamentEvent]:
         """Fetch and parse all tournaments"""
-        html_content = self.fetch_page()
-        tournaments = self.parse_freerolls(html_content)
+        with span("fetch.freerollpass.com"):
+            html_content = self.fetch_page()
+        return self.parse_events(html_content)
+
+    def parse_events(self, html_content: str, reference_time: Optional[datetime] = None,
+                     tz_offset: Optional[int] = None) -> List[TournamentEvent]:
+        """Parse HTML content into TournamentEvents (Budapest time)"""
+        tournaments = self.parse_freerolls(html_content, reference_time, tz_offset)
         
+        with span("parse.freerollpass.com.convert"):
+            events = self._to_events(tournaments)
+
+        self.stats["parsed"] = len(events)
+        return events
+
+    def _to_events(self, tournaments: List[Dict]) -> List[TournamentEvent]:
+        """Convert parsed tournament dicts to TournamentEvents in Budapest time"""
         events: List[TournamentEvent] = []
         for tournament in tournaments:
             try:
@@ -0,0 +1,184 @@
+"""Live summary board: a few pinned messages that are edited instead of re-posted"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+from .models import TournamentEvent, get_event_datetime
+
+# Discord rejects messages longer than 2000 characters
+MESSAGE_LIMIT = 2000
+
+
+def format_countdown(delta: timedelta) -> str:
+    """Human-readable time until start, e.g. '2h 15m'"""
+    minutes = max(0, int(delta.total_seconds() // 60))
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m"
+
+
+def format_board_line(e: TournamentEvent, now: datetime) -> str:
+    """Compact one-event block used on the board"""
+    if e['is_all_day'] or e['time'] is None:
+        when = f"{e['date'].strftime('%d.%m.')} (all day)"
+        countdown = ""
+    else:
+        start = get_event_datetime(e)
+        when = start.strftime('%H:%M %d.%m.')
+        countdown = f" · ⏳ {format_countdown(start - now)}"
+    return (
+        f"🕒 **{when}**{countdown}\n"
+        f"💰 **{e['name']}** · 🏢 {e['room']} · 💵 {e['prize']} · 🔑 **{e['password']}**"
+    )
+
+
+def render_board(events: List[TournamentEvent], now: datetime) -> List[str]:
+    """Render the board as a list of message chunks, each within MESSAGE_LIMIT"""
+    header = f"📅 **Freerolls for the next 24 hours** (updated {now.strftime('%H:%M')})\n"
+    if not events:
+        return [header + "\n📭 No freerolls in the next 24 hours."]
+
+    chunks: List[str] = []
+    current = header
+    for e in events:
+        block = "\n" + format_board_line(e, now) + "\n"
+        if len(current) + len(block) > MESSAGE_LIMIT:
+            chunks.append(current.rstrip())
+            current = ""
+        current += block
+    chunks.append(current.rstrip())
+    return chunks
+
+
+class LiveBoard:
+    """Keeps one board per day in the channel and edits it when the content changes
+
+    Message IDs are persisted so a restarted bot keeps editing the same board.
+    Content changes are applied at once; countdown-only refreshes are throttled
+    to refresh_interval seconds.
+    """
+
+    def __init__(self, state_file: str = "live_board.json", refresh_interval: int = 300):
+        self.state_file = state_file
+        self.refresh_interval = refresh_interval
+        self.day: Optional[str] = None
+        self.channel_id: Optional[int] = None
+        self.message_ids: List[int] = []
+        self.rendered: List[str] = []  # Last content of each board message
+        self.last_refresh: Optional[datetime] = None
+        # Serializes updates from the watcher and the password watch
+        self._lock: Optional[asyncio.Lock] = None
+        self._load_state()
+
+    def _load_state(self) -> None:
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.day = data.get("day")
+            self.channel_id = data.get("channel_id")
+            self.message_ids = [int(i) for i in data.get("message_ids", [])]
+        except Exception as e:
+            print(f"Error loading live board state: {e}")
+
+    def _save_state(self) -> None:
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "day": self.day,
+                    "channel_id": self.channel_id,
+                    "message_ids": self.message_ids,
+                }, f, indent=2)
+        except Exception as e:
+            print(f"Error saving live board state: {e}")
+
+    def jump_url(self, channel) -> Optional[str]:
+        """Link to the first board message, if the board exists in this channel"""
+        if not self.message_ids or self.channel_id != channel.id:
+            return None
+        return channel.get_partial_message(self.message_ids[0]).jump_url
+
+    async def update(self, channel, events: List[TournamentEvent], now: datetime, changed: bool,
+                     send: Callable[..., Awaitable], edit: Callable[..., Awaitable]) -> int:
+        """Bring the board in sync with events, return the number of API calls made
+
+        send(channel, content) must return the sent message (or None in dry run),
+        edit(message, content) edits an existing one.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()  # Created inside the running loop
+        async with self._lock:
+            return await self._update(channel, events, now, changed, send, edit)
+
+    async def _update(self, channel, events: List[TournamentEvent], now: datetime, changed: bool,
+                      send: Callable[..., Awaitable], edit: Callable[..., Awaitable]) -> int:
+        day = now.date().isoformat()
+        if day != self.day or channel.id != self.channel_id:
+            await self._start_new_board(channel, day)
+
+        if (not changed and self.last_refresh is not None
+                and (now - self.last_refresh).total_seconds() < self.refresh_interval):
+            return 0
+        self.last_refresh = now
+
+        chunks = render_board(events, now)
+        calls = 0
+
+        for index, content in enumerate(chunks):
+            if index < len(self.message_ids):
+                if index < len(self.rendered) and self.rendered[index] == content:
+                    continue
+                try:
+                    await edit(channel.get_partial_message(self.message_ids[index]), content)
+                except Exception as e:
+                    # Board message was deleted or is no longer editable: post a fresh board
+                    print(f"Error editing live board, re-posting it: {e}")
+                    self.message_ids = []
+                    self.rendered = []
+                    self.last_refresh = None
+                    return calls + await self._update(channel, events, now, True, send, edit)
+                calls += 1
+            else:
+                message = await send(channel, content)
+                calls += 1
+                if message is not None:
+                    self.message_ids.append(message.id)
+                    if index == 0:
+                        await self._pin(message)
+
+        # Board shrank: remove trailing messages that are no longer needed
+        while len(self.message_ids) > max(len(chunks), 1):
+            message_id = self.message_ids.pop()
+            try:
+                await channel.get_partial_message(message_id).delete()
+                calls += 1
+            except Exception as e:
+                print(f"Error deleting live board message {message_id}: {e}")
+
+        self.rendered = chunks
+        self._save_state()
+        return calls
+
+    async def _start_new_board(self, channel, day: str) -> None:
+        """Forget the previous day's board (unpinning it) and start fresh"""
+        if self.message_ids and self.channel_id == channel.id:
+            try:
+                await channel.get_partial_message(self.message_ids[0]).unpin()
+            except Exception as e:
+                print(f"Error unpinning previous live board: {e}")
+        self.day = day
+        self.channel_id = channel.id
+        self.message_ids = []
+        self.rendered = []
+        self.last_refresh = None
+
+    @staticmethod
+    async def _pin(message) -> None:
+        try:
+            await message.pin()
+        except Exception as e:
+            print(f"Error pinning live board message: {e}")
@@ -1,7 +1,7 @@
 """Data models for poker freeroll tournaments"""
 
 from typing import TypedDict, Optional
-from datetime import date, time
+from datetime import date, time, datetime
 
 
 class TournamentEvent(TypedDict):
@@ -14,3 +14,39 @@ class TournamentEvent(TypedDict):
     prize: str
     password: str
     source: str
+
+
+def event_to_dict(event: TournamentEvent) -> dict:
+    """Convert TournamentEvent to dictionary for comparison/storage"""
+    return {
+        "date": event["date"].isoformat(),
+        "time": event["time"].isoformat() if event["time"] else None,
+        "is_all_day": event["is_all_day"],
+        "room": event["room"],
+        "name": event["name"],
+        "prize": event["prize"],
+        "password": event["password"],
+        "source": event.get("source", "n/a")
+    }
+
+
+def get_event_datetime(event: TournamentEvent) -> datetime:
+    """Get datetime from event (date + time fields)"""
+    if event['is_all_day'] or event['time'] is None:
+        # For all-day events, use midnight
+        return datetime.combine(event['date'], datetime.min.time())
+    return datetime.combine(event['date'], event['time'])
+
+
+def is_password_pending(event) -> bool:
+    """True if the event (or its stored dict) has no published password yet
+
+    freerollpass.com reports an unpublished password as "n/a" after parsing,
+    freeroll-password.com shows "n/a" on the page itself.
+    """
+    return event.get("password") in (None, "", "n/a")
+
+
+def identity_key(data: dict) -> tuple:
+    """Identify an event (as stored by event_to_dict) independently of its password and prize"""
+    return tuple(data.get(k) for k in ("source", "date", "time", "room", "name"))
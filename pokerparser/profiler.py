@@ -0,0 +1,222 @@
+"""Low-overhead cycle profiler: per-stage spans plus a sampling stack profiler
+
+Enable with the PROFILE environment variable (or !profile on). Each watcher
+cycle (or offline page) records the wall time of its named spans; while a
+cycle runs, a background thread samples the Python stacks of all threads.
+The stacks of the slowest cycles are written as collapsed-stack files
+(one "frame;frame;frame count" line per stack, the input format of
+flamegraph.pl / speedscope), next to a per-stage timing summary.
+
+Spans are near free when profiling is off: span() returns a shared no-op
+context manager. The running cycle is tracked per asyncio task (a context
+variable), so concurrent cycles such as the watcher and the password watch
+keep their spans apart; code sent to a thread pool must be run in a copy of
+the caller's context (contextvars.copy_context().run) to be attributed.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class StackSampler:
+    """Samples the stacks of all threads (except itself) at a fixed interval"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.stacks = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.stacks
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(frames))] += 1
+
+
+class CycleProfiler:
+    """Collects span timings per cycle and keeps stack samples of the slowest cycles"""
+
+    def __init__(self, output_dir: str = "profiles", keep: int = 5, interval: float = 0.005):
+        self.enabled = False
+        self.output_dir = output_dir
+        self.keep = keep
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Stage timings of the cycle running in the current task/context
+        self._current: ContextVar[Optional[Dict[str, float]]] = ContextVar("profile_cycle", default=None)
+        # stage -> [count, total seconds, max seconds]
+        self.stage_totals: Dict[str, List[float]] = {}
+        self.cycles = 0
+        self.slowest: List[Tuple[float, str]] = []  # (duration, collapsed file path)
+
+    def enable(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str):
+        """Context manager timing one stage of the current cycle"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._book(name, time.perf_counter() - started)
+
+    def _book(self, name: str, elapsed: float) -> None:
+        stages = self._current.get()
+        with self._lock:
+            if stages is not None:
+                stages[name] = stages.get(name, 0.0) + elapsed
+            totals = self.stage_totals.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] = max(totals[2], elapsed)
+
+    @contextmanager
+    def collect(self):
+        """Time spans into a plain dict, without a cycle or stack sampling
+
+        Used in parse worker processes, whose own profiler is never reported;
+        the dict is sent back and booked with add_stages() in the bot.
+        """
+        stages: Dict[str, float] = {}
+        was_enabled = self.enabled
+        self.enabled = True
+        token = self._current.set(stages)
+        try:
+            yield stages
+        finally:
+            self._current.reset(token)
+            self.enabled = was_enabled
+
+    def add_stages(self, stages: Dict[str, float]) -> None:
+        """Book span timings measured elsewhere into the totals and the current cycle"""
+        if not self.enabled:
+            return
+        for name, elapsed in stages.items():
+            self._book(name, elapsed)
+
+    @contextmanager
+    def cycle(self, label: str = "cycle"):
+        """Profile one full cycle; nested spans are attributed to it"""
+        if not self.enabled:
+            yield
+            return
+        sampler = StackSampler(self.interval)
+        stages: Dict[str, float] = {}
+        token = self._current.set(stages)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            stacks = sampler.stop()
+            self._current.reset(token)
+            with self._lock:
+                self.cycles += 1
+            self._finish_cycle(label, duration, stages, stacks)
+
+    def _finish_cycle(self, label: str, duration: float, stages: Dict[str, float], stacks: Counter) -> None:
+        if self.keep > 0 and (len(self.slowest) < self.keep or duration > self.slowest[-1][0]):
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            safe_label = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)[:60]
+            path = os.path.join(self.output_dir, f"{stamp}-{safe_label}-{int(duration * 1000)}ms.collapsed")
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+                self.slowest.append((duration, path))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                # Only the N slowest cycles keep their stack files
+                while len(self.slowest) > self.keep:
+                    _, evicted = self.slowest.pop()
+                    if os.path.exists(evicted):
+                        os.remove(evicted)
+            except OSError as e:
+                print(f"Error writing profile: {e}")
+
+        stage_text = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in
+                               sorted(stages.items(), key=lambda item: item[1], reverse=True))
+        print(f"[profile] {label}: {duration * 1000:.1f}ms ({stage_text or 'no spans'})")
+        self.write_summary()
+
+    def summary_lines(self) -> List[str]:
+        with self._lock:
+            totals = sorted(self.stage_totals.items(), key=lambda item: item[1][1], reverse=True)
+        lines = [f"{self.cycles} cycles profiled", f"{'stage':<32}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for name, (count, total, maximum) in totals:
+            lines.append(f"{name:<32}{int(count):>8}{total * 1000:>12.1f}{total * 1000 / count:>10.2f}{maximum * 1000:>10.1f}")
+        lines.append("")
+        lines.append("Slowest cycles:")
+        for duration, path in self.slowest:
+            lines.append(f"  {duration * 1000:.1f}ms  {path}")
+        return lines
+
+    def write_summary(self) -> None:
+        try:
+            with open(os.path.join(self.output_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+                f.write("\n".join(self.summary_lines()) + "\n")
+        except OSError as e:
+            print(f"Error writing profile summary: {e}")
+
+
+PROFILER = CycleProfiler(
+    output_dir=os.environ.get("PROFILE_DIR", "profiles"),
+    keep=int(os.environ.get("PROFILE_KEEP", "5"))
+)
+if os.environ.get("PROFILE", ""):  # Non-empty string enables profiling, like DRY_RUN
+    PROFILER.enable()
+
+span = PROFILER.span
@@ -0,0 +1,128 @@
+"""Offline bulk re-parse of saved freeroll pages using a process pool
+
+Only the parser modules are imported here (never discordbot), so worker
+processes start without discord or config.json.
+"""
+
+import json
+import os
+import sys
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from .freerollpass import FreerollParser
+from .freeroll_password import FreeRollPasswordParser
+from .models import event_to_dict
+
+HTML_SUFFIXES = (".html", ".htm")
+
+# A saved page as handed to a worker: (name, raw bytes, modification time)
+PageJob = Tuple[str, bytes, float]
+
+
+def detect_source(html_content: str) -> Optional[str]:
+    """Guess which site a saved page came from by its main container markup"""
+    if 'id="freerollList"' in html_content or "id='freerollList'" in html_content:
+        return "freerollpass.com"
+    if "pt-cv-wrapper" in html_content:
+        return "freeroll-password.com"
+    return None
+
+
+def parse_page(job: PageJob, source: Optional[str] = None,
+               tz_offset: Optional[int] = None) -> Tuple[str, Optional[str], List[dict], int]:
+    """Parse one saved page (runs inside a worker process)
+
+    tz_offset fixes the freerollpass.com server timezone instead of deriving
+    it from the file's modification time, which is wrong for copied pages.
+    Returns (name, source, serialized events, page size in bytes).
+    """
+    name, raw, mtime = job
+    html_content = raw.decode("utf-8", errors="replace")
+    source = source or detect_source(html_content)
+
+    if source == "freerollpass.com":
+        # The timezone offset is derived from the page's server clock, so
+        # compare it against when the page was saved rather than now.
+        budapest_tz = timezone(timedelta(hours=1))
+        saved_at = datetime.fromtimestamp(mtime, budapest_tz).replace(tzinfo=None)
+        events = FreerollParser().parse_events(html_content, reference_time=saved_at, tz_offset=tz_offset)
+    elif source == "freeroll-password.com":
+        events = FreeRollPasswordParser().parse_freerolls(html_content)
+    else:
+        events = []
+
+    return name, source, [event_to_dict(e) for e in events], len(raw)
+
+
+def iter_pages(path: str) -> Iterator[PageJob]:
+    """Yield saved HTML pages from a directory tree or a tarball"""
+    if os.path.isdir(path):
+        for root, _dirs, files in os.walk(path):
+            for filename in sorted(files):
+                if not filename.lower().endswith(HTML_SUFFIXES):
+                    continue
+                full_path = os.path.join(root, filename)
+                with open(full_path, "rb") as f:
+                    yield full_path, f.read(), os.path.getmtime(full_path)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, "r:*") as tar:
+            for member in tar:
+                if not member.isfile() or not member.name.lower().endswith(HTML_SUFFIXES):
+                    continue
+                f = tar.extractfile(member)
+                if f is not None:
+                    yield member.name, f.read(), float(member.mtime)
+    else:
+        with open(path, "rb") as f:
+            yield path, f.read(), os.path.getmtime(path)
+
+
+def reparse(path: str, out: IO[str], workers: Optional[int] = None,
+            source: Optional[str] = None, report: IO[str] = sys.stderr,
+            tz_offset: Optional[int] = None) -> Dict[str, float]:
+    """Parse every saved page under path in parallel, writing events as JSON Lines
+
+    Results are written in input order. At most a few pages per worker are in
+    flight at once, so large tarballs are streamed instead of loaded whole.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    stats = {"pages": 0, "unknown": 0, "events": 0, "bytes": 0}
+    started = time.perf_counter()
+
+    def write_result(result) -> None:
+        name, page_source, events, size = result
+        stats["pages"] += 1
+        stats["bytes"] += size
+        if page_source is None:
+            stats["unknown"] += 1
+            print(f"Warning: Unrecognized page skipped: {name}", file=report)
+        for event in events:
+            event["file"] = name
+            out.write(json.dumps(event, ensure_ascii=False) + "\n")
+        stats["events"] += len(events)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in iter_pages(path):
+            pending.append(pool.submit(parse_page, job, source, tz_offset))
+            if len(pending) >= window:
+                write_result(pending.popleft().result())
+        while pending:
+            write_result(pending.popleft().result())
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    rate = elapsed if elapsed > 0 else 1e-9
+    print(
+        f"Parsed {stats['pages']} pages ({stats['unknown']} unrecognized), "
+        f"{stats['events']} events in {elapsed:.2f}s - "
+        f"{stats['pages'] / rate:.1f} pages/s, {stats['events'] / rate:.1f} events/s, "
+        f"{stats['bytes'] / rate / 1_000_000:.2f} MB/s with {workers} workers",
+        file=report
+    )
+    return stats
@@ -0,0 +1,281 @@
+"""Staged runtime for large deployments: scrape -> parse -> merge -> schedule -> send
+
+Each stage is an asyncio task connected to the next by a bounded queue, so a
+slow stage makes the ones before it wait instead of piling up work. Blocking
+page fetches run in a thread pool and CPU-bound parsing in a process pool,
+keeping the gateway event loop free for heartbeats.
+
+This module must not import discord: parse workers are spawned fresh and
+import only what they need from here.
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from .freerollpass import FreerollParser
+from .freeroll_password import FreeRollPasswordParser
+from .models import TournamentEvent, get_event_datetime
+from .drift import DriftMonitor
+from .profiler import PROFILER
+
+PARSERS = {
+    "freeroll-password.com": FreeRollPasswordParser,
+    "freerollpass.com": FreerollParser,
+}
+
+# Marks the end of one scrape cycle as it travels through the queues
+CYCLE_END = object()
+
+
+def fetch_page(name: str, url: str) -> str:
+    """Download one source page (runs in the thread pool)"""
+    return PARSERS[name](url=url).fetch_page()
+
+
+def parse_page(name: str, url: str, html_content: str, baseline: Optional[str] = None,
+               profile: bool = False) -> Tuple[List[TournamentEvent], Dict, Dict[str, float]]:
+    """Parse one source page (runs in a worker process)
+
+    Returns (events, parser stats, span timings); the timings are only
+    collected with profile=True, for the bot's profiler to book.
+    """
+    parser = PARSERS[name](url=url)
+    parser.baseline = baseline
+    if not profile:
+        return _parse(parser, html_content), parser.stats, {}
+    with PROFILER.collect() as stages:
+        events = _parse(parser, html_content)
+    return events, parser.stats, stages
+
+
+def _parse(parser, html_content: str) -> List[TournamentEvent]:
+    if isinstance(parser, FreerollParser):
+        return parser.parse_events(html_content)
+    return parser.parse_freerolls(html_content)
+
+
+class MemoryGuard:
+    """tracemalloc-based ceiling on Python heap usage
+
+    Tracing with a single frame keeps the overhead low; the guard is only
+    consulted once per scrape cycle.
+    """
+
+    def __init__(self, limit_mb: Optional[float]):
+        self.limit_mb = limit_mb
+        self.trips = 0  # Metric: times the ceiling was hit
+        self.tripped = False  # Still above the ceiling since the last trip
+        if limit_mb and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+
+    def usage_mb(self) -> float:
+        if not tracemalloc.is_tracing():
+            return 0.0
+        current, _peak = tracemalloc.get_traced_memory()
+        return current / (1024 * 1024)
+
+    def over_limit(self) -> bool:
+        """True if usage exceeds the ceiling even after a garbage collection
+
+        The collection and the allocation report run once per trip, not on
+        every cycle spent above the ceiling, so they don't stall the loop.
+        """
+        if not self.limit_mb or self.usage_mb() < self.limit_mb:
+            self.tripped = False
+            return False
+        if self.tripped:
+            return True
+        gc.collect()
+        if self.usage_mb() < self.limit_mb:
+            return False
+        self.tripped = True
+        self.trips += 1
+        top = tracemalloc.take_snapshot().statistics("lineno")[:3]
+        print(f"[metric] memory_ceiling usage={self.usage_mb():.1f}MB limit={self.limit_mb}MB")
+        for stat in top:
+            print(f"  {stat}")
+        return True
+
+
+class Pipeline:
+    """Scrape, parse and merge stages producing merged snapshots for the watcher"""
+
+    def __init__(self, get_sources: Callable[[], Dict[str, str]], wait_for_next_cycle: Callable[[], Awaitable],
+                 monitor: DriftMonitor, parse_workers: int = 2, queue_size: int = 4,
+                 memory_limit_mb: Optional[float] = None):
+        self.get_sources = get_sources
+        self.wait_for_next_cycle = wait_for_next_cycle
+        self.monitor = monitor
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.memory = MemoryGuard(memory_limit_mb)
+        self.fetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scrape")
+        self.parse_pool = self._new_parse_pool()
+        self.pages: Optional[asyncio.Queue] = None
+        self.parsed: Optional[asyncio.Queue] = None
+        self.snapshots: Optional[asyncio.Queue] = None  # (merged, freshly parsed) per cycle
+        self._tasks: List[asyncio.Task] = []
+
+    def _new_parse_pool(self) -> ProcessPoolExecutor:
+        # spawn: workers start from a clean interpreter instead of a fork of the bot
+        return ProcessPoolExecutor(max_workers=self.parse_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def set_parse_workers(self, parse_workers: int) -> None:
+        """Replace the worker pool; parses already running finish in the old one"""
+        if parse_workers == self.parse_workers:
+            return
+        old_pool = self.parse_pool
+        self.parse_workers = parse_workers
+        self.parse_pool = self._new_parse_pool()
+        old_pool.shutdown(wait=False)
+
+    def start(self) -> None:
+        """Create the queues and stage tasks inside the running loop"""
+        if self._tasks:
+            return
+        self.pages = asyncio.Queue(maxsize=self.queue_size)
+        self.parsed = asyncio.Queue(maxsize=self.queue_size)
+        self.snapshots = asyncio.Queue(maxsize=1)
+        self._tasks = [
+            asyncio.create_task(self._scrape_stage()),
+            asyncio.create_task(self._parse_stage()),
+            asyncio.create_task(self._merge_stage()),
+        ]
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self.fetch_pool.shutdown(wait=False)
+        self.parse_pool.shutdown(wait=False)
+
+    async def refresh_source(self, name: str, url: str) -> Tuple[List[TournamentEvent], bool]:
+        """Fetch and parse one source outside the cycle on the pipeline's pools
+
+        Returns (events, fresh) like discordbot.fetch_source; used by the password watch.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.monitor.should_fetch(name, datetime.now()):
+            return self.monitor.last_good(name), False
+        try:
+            html_content = await loop.run_in_executor(self.fetch_pool, fetch_page, name, url)
+            events, stats, stages = await loop.run_in_executor(
+                self.parse_pool, parse_page, name, url, html_content, self.monitor.baseline(name), PROFILER.enabled
+            )
+        except Exception as e:
+            print(f"Error refreshing {name}: {e}")
+            return self.monitor.last_good(name), False
+        PROFILER.add_stages(stages)
+        events = self.monitor.record(name, events, stats, datetime.now())
+        return events, not self.monitor.health(name).drifting
+
+    async def next_snapshot(self) -> Tuple[List[TournamentEvent], List[TournamentEvent]]:
+        """Wait for the next cycle: (merged event list, events freshly parsed in it)
+
+        Only the second list is new information; the merged one also holds
+        last good events of backed-off or drifting sources.
+        """
+        self.start()
+        return await self.snapshots.get()
+
+    async def _scrape_stage(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.memory.over_limit():
+                print("Warning: memory ceiling reached, skipping this scrape cycle")
+            else:
+                for name, url in list(self.get_sources().items()):
+                    if not self.monitor.should_fetch(name, datetime.now()):
+                        continue
+                    try:
+                        html_content = await loop.run_in_executor(self.fetch_pool, fetch_page, name, url)
+                    except Exception as e:
+                        print(f"Error fetching {name}: {e}")
+                        continue
+                    await self.pages.put((name, url, html_content))
+                await self.pages.put(CYCLE_END)
+            await self.wait_for_next_cycle()
+
+    async def _parse_stage(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.pages.get()
+            if item is CYCLE_END:
+                await self.parsed.put(CYCLE_END)
+                continue
+            name, url, html_content = item
+            try:
+                events, stats, stages = await loop.run_in_executor(
+                    self.parse_pool, parse_page, name, url, html_content, self.monitor.baseline(name),
+                    PROFILER.enabled
+                )
+            except Exception as e:
+                print(f"Error parsing {name}: {e}")
+                continue
+            # Worker spans are timed in the worker process and booked here
+            PROFILER.add_stages(stages)
+            await self.parsed.put((name, events, stats))
+
+    async def _merge_stage(self) -> None:
+        results: Dict[str, List[TournamentEvent]] = {}
+        fresh: List[TournamentEvent] = []
+        while True:
+            item = await self.parsed.get()
+            if item is not CYCLE_END:
+                name, events, stats = item
+                results[name] = self.monitor.record(name, events, stats, datetime.now())
+                if not self.monitor.health(name).drifting:
+                    fresh.extend(events)
+                continue
+
+            # Sources that were backed off or failed contribute their last good events
+            merged: List[TournamentEvent] = []
+            for name in self.get_sources():
+                merged.extend(results.get(name, self.monitor.last_good(name)))
+            merged.sort(key=get_event_datetime)
+            await self.snapshots.put((merged, fresh))
+            results, fresh = {}, []
+
+
+class Sender:
+    """Bounded outgoing message queue drained by a single task
+
+    Producers await put() when the queue is full, which throttles the
+    schedule stage instead of buffering an unbounded backlog of sends.
+    on_sent runs only after a successful send and on_failed after a failed
+    one, so bookkeeping such as marking an event as announced is skipped
+    for a failed send and the event is retried on the next cycle.
+    """
+
+    def __init__(self, send: Callable[..., Awaitable], queue_size: int = 50):
+        self.send = send
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def put(self, target, content: str, on_sent: Optional[Callable[[], None]] = None,
+                  on_failed: Optional[Callable[[], None]] = None) -> None:
+        if self._task is None:
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._drain())
+        await self.queue.put((target, content, on_sent, on_failed))
+
+    async def _drain(self) -> None:
+        while True:
+            target, content, on_sent, on_failed = await self.queue.get()
+            try:
+                await self.send(target, content)
+                callback = on_sent
+            except Exception as e:
+                print(f"Error sending message to {target}: {e}")
+                callback = on_failed
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error after sending message to {target}: {e}")
@@ -0,0 +1,40 @@
+"""Versioned holder of the current merged event list"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import List, Optional
+from .models import TournamentEvent, event_to_dict
+
+
+def events_digest(events: List[TournamentEvent]) -> str:
+    """Stable content hash of an event list"""
+    payload = json.dumps([event_to_dict(e) for e in events], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class EventSnapshot:
+    """Latest scraped events plus a version that only increases when the content changes
+
+    Consumers (feed server, caches) key their pre-rendered output on version.
+    """
+
+    def __init__(self):
+        self.events: List[TournamentEvent] = []
+        self.version = 0
+        self.digest: Optional[str] = None
+        self.updated_at: Optional[datetime] = None    # Last content change
+        self.refreshed_at: Optional[datetime] = None  # Last scrape, changed or not
+
+    def update(self, events: List[TournamentEvent], now: Optional[datetime] = None) -> bool:
+        """Replace the events, return True if the content changed"""
+        now = now or datetime.now()
+        self.refreshed_at = now
+        digest = events_digest(events)
+        if digest == self.digest:
+            return False
+        self.events = events
+        self.digest = digest
+        self.version += 1
+        self.updated_at = now
+        return True
@@ -7,13 +7,14 @@ import os
 # Add the pokerparser directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Import and run the bot
-from pokerparser.discordbot import bot, TOKEN
-
 if __name__ == "__main__":
+    # Imported here and not at module level: parse worker processes re-import
+    # this file and must not load discord or config.json
+    from pokerparser.discordbot import main
+
     try:
         print("Starting Discord bot...", flush=True)
-        bot.run(TOKEN)
+        main()
     except KeyboardInterrupt:
         print("\nBot stopped by user.", flush=True)
         sys.exit(0)